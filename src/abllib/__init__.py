@@ -10,7 +10,8 @@ from abllib.general import try_import_module
 from abllib.log import LogLevel, get_logger
 from abllib.storage import (CacheStorage, PersistentStorage, StorageView,
                             VolatileStorage)
-from abllib.wrapper import Lock, NamedLock, NamedSemaphore, Semaphore
+from abllib.wrapper import (Lock, NamedLock, NamedSemaphore, ReadWriteLock,
+                            Semaphore)
 
 __exports__ = [
     alg,
@@ -28,6 +29,7 @@ __exports__ = [
     LogLevel,
     Lock,
     Semaphore,
+    ReadWriteLock,
     NamedLock,
     NamedSemaphore,
     CacheStorage,
@@ -2,12 +2,52 @@
 
 from __future__ import annotations
 
+import sys
 from typing import Any
 
 from abllib import error
 
 # mypy: ignore-errors
 
+# the maximum number of compiled key paths which are cached
+_KEY_PATH_CACHE_SIZE = 4096
+
+# maps each recently used key to its validated parts, split into the parent dicts and the last part
+_key_paths: dict[str, tuple[tuple[str, ...], str]] = {}
+
+def _key_path(key: Any) -> tuple[tuple[str, ...], str]:
+    """
+    Return the parts of key, split into the names of the parent dicts and the name of the item itself.
+
+    Raises a WrongTypeError if key isn't a str, and an InvalidKeyError if it isn't a valid key.
+    """
+
+    try:
+        return _key_paths[key]
+    except (KeyError, TypeError):
+        # unhashable keys raise a TypeError, and are rejected below
+        pass
+
+    if not isinstance(key, str):
+        raise error.WrongTypeError.with_values(key, str)
+
+    if "." in key:
+        if key[0] == ".":
+            raise error.InvalidKeyError("Key cannot start with '.'")
+        if key[-1] == ".":
+            raise error.InvalidKeyError("Key cannot end with '.'")
+        if ".." in key:
+            raise error.InvalidKeyError("Key cannot contain '..'")
+
+    # interned strings compare by identity in the dict lookups
+    parts = tuple(sys.intern(part) for part in key.split("."))
+    path = (parts[:-1], parts[-1])
+
+    if len(_key_paths) >= _KEY_PATH_CACHE_SIZE:
+        _key_paths.clear()
+    _key_paths[key] = path
+    return path
+
 class _AutoremoveDict(dict):
     """An internal class representing auto-removable subdicts within the storage"""
 
@@ -113,138 +153,88 @@ class _BaseStorage():
 
     def _contains(self, key: str) -> bool:
         self._ensure_initialized()
-        self._ensure_key_validity(key)
+        parents, last = _key_path(key)
 
-        if "." not in key:
-            return key in self._store
-
-        parts = key.split(".")
-        curr_dict: dict[str, Any] = self._store
-        for c, part in enumerate(parts):
+        curr_dict = self._store
+        for part in parents:
             if part not in curr_dict:
                 return False
-            # if it isn't the last part
-            if c < len(parts) - 1:
-                curr_dict: dict[str, Any] = curr_dict[part]
+            curr_dict = curr_dict[part]
 
-        return parts[-1] in curr_dict
+        return last in curr_dict
 
     def _get(self, key: str) -> Any:
         self._ensure_initialized()
-        self._ensure_key_validity(key)
+        parents, last = _key_path(key)
 
-        if "." not in key:
-            if key not in self._store:
-                raise error.KeyNotFoundError.with_values(key)
-            return self._store[key]
-
-        parts = key.split(".")
         curr_dict = self._store
-        for c, part in enumerate(parts):
+        for part in parents:
             if part not in curr_dict:
-                invalid_key = ""
-                for item in parts:
-                    invalid_key += f"{item}" if invalid_key == "" else f".{item}"
-                    if item == part:
-                        break
-                raise error.KeyNotFoundError.with_values(invalid_key)
-            # if it isn't the last part
-            if c < len(parts) - 1:
-                curr_dict = curr_dict[part]
-
-        return curr_dict[parts[-1]]
+                raise error.KeyNotFoundError.with_values(self._missing_key(parents, last))
+            curr_dict = curr_dict[part]
+
+        if last not in curr_dict:
+            raise error.KeyNotFoundError.with_values(key)
+        return curr_dict[last]
 
     def _set(self, key: str, item: Any) -> None:
         self._ensure_initialized()
-        self._ensure_key_validity(key)
-
-        if "." not in key:
-            self._store[key] = item
-            return
+        parents, last = _key_path(key)
 
-        parts = key.split(".")
         curr_dict = self._store
-        for c, part in enumerate(parts):
-            # if it isn't the last part
-            if c < len(parts) - 1:
-                # add a missing dictionary
-                if part not in curr_dict:
-                    curr_dict[part] = _AutoremoveDict()
-                curr_dict = curr_dict[part]
-            else:
-                # add the actual item
-                curr_dict[part] = item
+        for part in parents:
+            # add a missing dictionary
+            if part not in curr_dict:
+                curr_dict[part] = _AutoremoveDict()
+            curr_dict = curr_dict[part]
+
+        # add the actual item
+        curr_dict[last] = item
 
     def _del(self, key: str) -> None:
         self._ensure_initialized()
-        self._ensure_key_validity(key)
-
-        if "." not in key:
-            if key not in self._store:
-                raise error.KeyNotFoundError.with_values(key)
-            del self._store[key]
-            return
+        parents, last = _key_path(key)
 
-        parts = key.split(".")
+        # the dicts containing each of the parents
+        containers = []
         curr_dict = self._store
-        for c, part in enumerate(parts):
+        for part in parents:
             if part not in curr_dict:
-                invalid_key = ""
-                for item in parts:
-                    invalid_key += f"{item}" if invalid_key == "" else f".{item}"
-                    if item == part:
-                        break
-                raise error.KeyNotFoundError.with_values(invalid_key)
-
-            # if it isn't the last part
-            if c < len(parts) - 1:
-                curr_dict = curr_dict[part]
-            else:
-                # delete the actual item
-                del curr_dict[part]
-
-        # delete empty autogenerated dicts
-        key = key.rsplit(".", maxsplit=1)[0]
-        parts = key.split(".")
-
-        while True:
-            curr_dict = self._store
-
-            for c, part in enumerate(parts):
-                # if it isn't the last part
-                if c < len(parts) - 1:
-                    curr_dict = curr_dict[part]
-                else:
-                    # pylint: disable-next=unidiomatic-typecheck
-                    if type(curr_dict[part]) == _AutoremoveDict and len(curr_dict[part]) == 0:
-                        # delete the actual item
-                        del curr_dict[part]
-                    else:
-                        # we are done
-                        return
-
-            if "." in key:
-                key = key.rsplit(".", maxsplit=1)[0]
-                parts = key.split(".")
-            else:
-                # we deleted every subkey
+                raise error.KeyNotFoundError.with_values(self._missing_key(parents, last))
+            containers.append(curr_dict)
+            curr_dict = curr_dict[part]
+
+        if last not in curr_dict:
+            raise error.KeyNotFoundError.with_values(key)
+        # delete the actual item
+        del curr_dict[last]
+
+        # delete empty autogenerated dicts, starting with the innermost one
+        for c in range(len(parents) - 1, -1, -1):
+            sub_dict = containers[c][parents[c]]
+            # pylint: disable-next=unidiomatic-typecheck
+            if type(sub_dict) != _AutoremoveDict or len(sub_dict) != 0:
+                # we are done
                 return
+            del containers[c][parents[c]]
+
+    def _missing_key(self, parents: tuple[str, ...], last: str) -> str:
+        """Return the first part of the key which doesn't exist in the storage"""
+
+        curr_dict = self._store
+        for c, part in enumerate(parents):
+            if part not in curr_dict:
+                return ".".join(parents[:c + 1])
+            curr_dict = curr_dict[part]
+
+        return ".".join(parents + (last,))
 
     def _ensure_initialized(self) -> None:
         if self._store is None:
             raise error.NotInitializedError()
 
     def _ensure_key_validity(self, key: Any) -> None:
-        if not isinstance(key, str):
-            raise error.WrongTypeError.with_values(key, str)
-
-        if "." in key:
-            if key[0] == ".":
-                raise error.InvalidKeyError("Key cannot start with '.'")
-            if key[-1] == ".":
-                raise error.InvalidKeyError("Key cannot end with '.'")
-            if ".." in key:
-                raise error.InvalidKeyError("Key cannot contain '..'")
+        _key_path(key)
 
     def __init_subclass__(cls):
         if cls._STORAGE_NAME == "BaseStorage":
@@ -1,21 +1,16 @@
 """A module containing general-purpose algorithms"""
 
-from typing import Callable
-
-from abllib.general import try_import_module
-
-Levenshtein = try_import_module("Levenshtein")
-
-# mypy: disable-error-code="no-redef"
-
-if Levenshtein is None:
-    from abllib.alg._levenshtein import levenshtein_distance
-else:
-    # use C implementation
-    levenshtein_distance = Levenshtein.distance
-
-levenshtein_distance: Callable[[str, str], int]
+from abllib.alg._bktree import BKTree
+from abllib.alg._cdist import cdist
+from abllib.alg._engine import levenshtein_distance, levenshtein_many
+from abllib.alg._jaro import jaro_winkler_similarity
+from abllib.alg._osa import osa_distance
 
 __exports__ = [
-    levenshtein_distance
+    BKTree,
+    cdist,
+    jaro_winkler_similarity,
+    levenshtein_distance,
+    levenshtein_many,
+    osa_distance
 ]
@@ -0,0 +1,61 @@
+"""A module containing a levenshtein_distance function limited to a diagonal band"""
+
+# branching with if is much faster than min in the inner loop
+# pylint: disable=consider-using-min-builtin
+
+def banded_distance(token1: str, token2: str, max_dist: int) -> int:
+    """
+    Calculate the levenshtein distance between token1 and token2, stopping early if it exceeds max_dist
+
+    Returns max_dist + 1 if the distance is larger than max_dist.
+
+    Only the cells within max_dist of the main diagonal are calculated (Ukkonen, 1985).
+    token1 needs to be at least as long as token2.
+    """
+
+    # any value above max_dist is treated as 'too far'
+    too_far = max_dist + 1
+
+    if len(token1) - len(token2) > max_dist:
+        return too_far
+
+    token2_len = len(token2)
+
+    prev_row = [t2 if t2 <= max_dist else too_far for t2 in range(token2_len + 1)]
+    curr_row = [too_far] * (token2_len + 1)
+
+    for t1, char in enumerate(token1, start=1):
+        start = t1 - max_dist
+        if start < 1:
+            start = 1
+            curr_row[0] = t1 if t1 <= max_dist else too_far
+            row_min = curr_row[0]
+        else:
+            # the cell left of the band could still hold a value from two rows ago
+            curr_row[start - 1] = too_far
+            row_min = too_far
+
+        end = min(t1 + max_dist, token2_len)
+
+        left = curr_row[start - 1]
+        for t2 in range(start, end + 1):
+            dist = prev_row[t2 - 1] + (char != token2[t2 - 1])
+            if prev_row[t2] + 1 < dist:
+                dist = prev_row[t2] + 1
+            if left + 1 < dist:
+                dist = left + 1
+            if dist > too_far:
+                dist = too_far
+
+            curr_row[t2] = dist
+            left = dist
+            if dist < row_min:
+                row_min = dist
+
+        # the distances can never decrease in later rows
+        if row_min > max_dist:
+            return too_far
+
+        prev_row, curr_row = curr_row, prev_row
+
+    return prev_row[token2_len]
@@ -0,0 +1,130 @@
+"""A module containing bit-parallel levenshtein_distance functions"""
+
+import numpy as np
+
+from abllib.alg._banded import banded_distance
+from abllib.error import WrongTypeError
+
+def levenshtein_distance(token1: str, token2: str, max_dist: int | None = None) -> int:
+    """
+    Calculate the levenshtein distance between token1 and token2
+
+    This represents the edit distance between two strings
+
+    If max_dist is given, the calculation stops as soon as the distance is known to exceed it,
+    in which case max_dist + 1 is returned.
+
+    Uses the bit-vector algorithm by Myers (1999) in the formulation by Hyyrö (2001),
+    with python integers acting as arbitrarily long bit vectors.
+    """
+
+    if not isinstance(token1, str):
+        raise WrongTypeError.with_values(token1, str)
+    if not isinstance(token2, str):
+        raise WrongTypeError.with_values(token2, str)
+
+    # the shorter token is used as the pattern, which keeps the bit vectors small
+    if len(token1) < len(token2):
+        token1, token2 = token2, token1
+
+    if max_dist is None:
+        if len(token2) == 0:
+            return len(token1)
+
+        return _distance(_pattern_masks(token2), len(token2), token1)
+
+    if not isinstance(max_dist, int):
+        raise WrongTypeError.with_values(max_dist, int)
+    if max_dist < 0:
+        raise ValueError("max_dist needs to be >= 0")
+
+    if len(token1) - len(token2) > max_dist:
+        return max_dist + 1
+
+    # in pure python, the band only pays off if it is much narrower than the pattern
+    if 2 * max_dist + 1 < len(token2) // 2:
+        return banded_distance(token1, token2, max_dist)
+
+    if len(token2) == 0:
+        return len(token1)
+
+    return min(_distance(_pattern_masks(token2), len(token2), token1), max_dist + 1)
+
+def levenshtein_many(query: str, candidates: list[str], max_dist: int | None = None) -> np.typing.NDArray[np.int64]:
+    """
+    Calculate the levenshtein distance between query and each candidate
+
+    Returns a numpy array containing the distances, in the same order as candidates.
+
+    If max_dist is given, all distances larger than max_dist are returned as max_dist + 1.
+    """
+
+    if not isinstance(query, str):
+        raise WrongTypeError.with_values(query, str)
+    if max_dist is not None:
+        if not isinstance(max_dist, int):
+            raise WrongTypeError.with_values(max_dist, int)
+        if max_dist < 0:
+            raise ValueError("max_dist needs to be >= 0")
+
+    distances = np.empty(len(candidates), dtype=np.int64)
+
+    # the query is always used as the pattern, so its masks only need to be built once
+    masks = _pattern_masks(query)
+    query_len = len(query)
+
+    for i, candidate in enumerate(candidates):
+        if not isinstance(candidate, str):
+            raise WrongTypeError.with_values(candidate, str)
+
+        if max_dist is not None and abs(len(candidate) - query_len) > max_dist:
+            distances[i] = max_dist + 1
+        elif query_len == 0:
+            distances[i] = len(candidate)
+        else:
+            distances[i] = _distance(masks, query_len, candidate)
+
+    if max_dist is not None:
+        np.minimum(distances, max_dist + 1, out=distances)
+
+    return distances
+
+def _pattern_masks(pattern: str) -> dict[str, int]:
+    """Return a bitmask for each character, where bit i is set if pattern[i] equals the character"""
+
+    masks: dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+def _distance(masks: dict[str, int], pattern_len: int, text: str) -> int:
+    """Calculate the edit distance between the pattern described by masks and the text"""
+
+    mask = (1 << pattern_len) - 1
+    last_bit = 1 << (pattern_len - 1)
+    get_mask = masks.get
+
+    # vertical positive / negative deltas of the current column
+    vp = mask
+    vn = 0
+    score = pattern_len
+
+    for char in text:
+        eq = get_mask(char, 0)
+        d0 = (((eq & vp) + vp) ^ vp) | eq | vn
+        hp = vn | ~(d0 | vp)
+        hn = vp & d0
+
+        if hp & last_bit:
+            score += 1
+        elif hn & last_bit:
+            score -= 1
+
+        hp = (hp << 1) | 1
+        hn = hn << 1
+
+        # python integers have infinite sign bits, so the state needs to be cut back to the pattern length
+        vp = (hn | ~(d0 | hp)) & mask
+        vn = hp & d0 & mask
+
+    return score
@@ -0,0 +1,162 @@
+"""A module containing the BKTree class"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from abllib.alg._engine import levenshtein_distance
+from abllib.error import KeyNotFoundError, WrongTypeError
+
+class BKTree():
+    """
+    A BK-tree (Burkhard-Keller tree), which finds all words within a given levenshtein distance of a query.
+
+    The levenshtein distance is a metric, so most of the tree can be skipped during a search,
+    instead of comparing the query to every single word.
+
+    Words can be inserted and removed at any time.
+    Removed words are only marked as removed, and are revived if they are inserted again.
+    Once the removed words outnumber the contained words, the tree is rebuilt without them.
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root: _Node | None = None
+        self._size = 0
+        self._removed = 0
+
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word: str) -> None:
+        """Insert a word into the tree. Inserting a word which is already contained does nothing."""
+
+        if not isinstance(word, str):
+            raise WrongTypeError.with_values(word, str)
+
+        if self._root is None:
+            self._root = _Node(word)
+            self._size += 1
+            return
+
+        node = self._root
+        while True:
+            dist = levenshtein_distance(word, node.word)
+            if dist == 0:
+                if node.removed:
+                    node.removed = False
+                    self._size += 1
+                    self._removed -= 1
+                return
+
+            child = node.children.get(dist)
+            if child is None:
+                node.children[dist] = _Node(word)
+                self._size += 1
+                return
+            node = child
+
+    def remove(self, word: str) -> None:
+        """
+        Remove a word from the tree.
+
+        Raises a KeyNotFoundError if the word isn't contained.
+        """
+
+        node = self._find(word)
+        if node is None or node.removed:
+            raise KeyNotFoundError.with_values(word)
+
+        node.removed = True
+        self._size -= 1
+        self._removed += 1
+
+        # searches still need to visit removed nodes, so they are deleted once they are the majority
+        if self._removed > self._size:
+            self._rebuild()
+
+    def search(self, word: str, max_dist: int) -> list[tuple[str, int]]:
+        """
+        Return all contained words within max_dist of word, together with their levenshtein distance.
+
+        The results are sorted by ascending distance.
+        """
+
+        if not isinstance(word, str):
+            raise WrongTypeError.with_values(word, str)
+        if not isinstance(max_dist, int):
+            raise WrongTypeError.with_values(max_dist, int)
+        if max_dist < 0:
+            raise ValueError("max_dist needs to be >= 0")
+
+        results: list[tuple[str, int]] = []
+        if self._root is None:
+            return results
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+
+            # if the distance is larger than this bound, no child can contain a result
+            # so the exact distance isn't needed
+            bound = max_dist + max(node.children, default=0)
+            dist = levenshtein_distance(word, node.word, bound)
+
+            if dist <= max_dist and not node.removed:
+                results.append((node.word, dist))
+
+            # because of the triangle inequality, only these children can contain results
+            for child_dist, child in node.children.items():
+                if dist - max_dist <= child_dist <= dist + max_dist:
+                    stack.append(child)
+
+        results.sort(key=lambda result: result[1])
+        return results
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word)
+        return node is not None and not node.removed
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _rebuild(self) -> None:
+        """Rebuild the tree from all contained words, which deletes the removed nodes"""
+
+        words = []
+        stack = [] if self._root is None else [self._root]
+        while stack:
+            node = stack.pop()
+            if not node.removed:
+                words.append(node.word)
+            stack.extend(node.children.values())
+
+        self._root = None
+        self._size = 0
+        self._removed = 0
+        for word in words:
+            self.insert(word)
+
+    def _find(self, word: str) -> _Node | None:
+        """Return the node containing word, including removed nodes"""
+
+        if not isinstance(word, str):
+            raise WrongTypeError.with_values(word, str)
+
+        node = self._root
+        while node is not None:
+            dist = levenshtein_distance(word, node.word)
+            if dist == 0:
+                return node
+            node = node.children.get(dist)
+
+        return None
+
+class _Node():
+    """A single word in a BKTree, with its children keyed by their distance to it"""
+
+    __slots__ = ("word", "children", "removed")
+
+    def __init__(self, word: str) -> None:
+        self.word = word
+        self.children: dict[int, _Node] = {}
+        self.removed = False
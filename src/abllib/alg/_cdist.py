@@ -0,0 +1,99 @@
+"""A module containing the cdist function"""
+
+import os
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from abllib.alg._engine import levenshtein_many
+from abllib.error import WrongTypeError
+from abllib.pproc import WorkerProcess
+
+def cdist(queries: list[str],
+          choices: list[str],
+          max_dist: int | None = None,
+          workers: int = 1) -> np.typing.NDArray[np.int64]:
+    """
+    Calculate the levenshtein distance between each query and each choice
+
+    Returns a numpy array of shape (len(queries), len(choices)),
+    such that result[i][j] is the distance between queries[i] and choices[j].
+
+    If max_dist is given, all distances larger than max_dist are returned as max_dist + 1.
+
+    If workers is larger than 1, the queries are split into chunks which are calculated in separate processes.
+    Pass -1 to use all available cpu cores.
+    """
+
+    if not isinstance(workers, int):
+        raise WrongTypeError.with_values(workers, int)
+    if workers == -1:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers needs to be >= 1 or -1")
+
+    shape = (len(queries), len(choices))
+
+    workers = min(workers, len(queries))
+    if workers <= 1:
+        distances = np.empty(shape, dtype=np.int64)
+        _fill_rows(distances, 0, queries, choices, max_dist)
+        return distances
+
+    # the worker processes write their results directly into shared memory
+    # size can't be 0, even if choices is empty
+    shm = SharedMemory(create=True, size=max(1, shape[0] * shape[1] * np.dtype(np.int64).itemsize))
+    try:
+        processes: list[WorkerProcess] = []
+        for start, end in _chunk_ranges(len(queries), workers):
+            process = WorkerProcess(target=_fill_shared_rows,
+                                    args=(shm.name, shape, start, queries[start:end], choices, max_dist),
+                                    daemon=True)
+            process.start()
+            processes.append(process)
+
+        for process in processes:
+            process.join(reraise=True)
+
+        distances = np.ndarray(shape, dtype=np.int64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return distances
+
+def _fill_shared_rows(shm_name: str,
+                      shape: tuple[int, int],
+                      start: int,
+                      queries: list[str],
+                      choices: list[str],
+                      max_dist: int | None) -> None:
+    shm = SharedMemory(name=shm_name)
+    try:
+        distances: np.typing.NDArray[np.int64] = np.ndarray(shape, dtype=np.int64, buffer=shm.buf)
+        _fill_rows(distances, start, queries, choices, max_dist)
+        # the array needs to be released before the shared memory can be closed
+        del distances
+    finally:
+        shm.close()
+
+def _fill_rows(distances: np.typing.NDArray[np.int64],
+               start: int,
+               queries: list[str],
+               choices: list[str],
+               max_dist: int | None) -> None:
+    for i, query in enumerate(queries):
+        distances[start + i] = levenshtein_many(query, choices, max_dist)
+
+def _chunk_ranges(total: int, chunks: int) -> list[tuple[int, int]]:
+    """Split range(total) into chunks of nearly equal size"""
+
+    size, remainder = divmod(total, chunks)
+
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        end = start + size + (1 if i < remainder else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
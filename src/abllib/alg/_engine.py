@@ -0,0 +1,15 @@
+"""A module selecting the levenshtein implementation used by the alg module"""
+
+from abllib.general import try_import_module
+
+Levenshtein = try_import_module("Levenshtein")
+
+# pylint: disable=unused-import
+# mypy: disable-error-code="no-redef"
+
+if Levenshtein is None:
+    # use bit-parallel python implementation
+    from abllib.alg._bitparallel import levenshtein_distance, levenshtein_many
+else:
+    # use C implementation
+    from abllib.alg._native import levenshtein_distance, levenshtein_many
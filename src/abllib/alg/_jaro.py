@@ -0,0 +1,69 @@
+"""A module containing the jaro-winkler similarity function"""
+
+from abllib.error import WrongTypeError
+
+# the winkler bonus only considers this many common prefix characters
+_MAX_PREFIX = 4
+
+def jaro_winkler_similarity(token1: str, token2: str, prefix_weight: float = 0.1) -> float:
+    """
+    Calculate the jaro-winkler similarity between token1 and token2
+
+    Returns a float value between 0.0 and 1.0 (inclusive), where 1.0 means that both tokens are equal.
+
+    The jaro similarity counts the characters which occur in both tokens near the same position,
+    and the transpositions between them.
+    Tokens with a common prefix of up to four characters get a bonus, which is scaled by prefix_weight.
+    """
+
+    if not isinstance(token1, str):
+        raise WrongTypeError.with_values(token1, str)
+    if not isinstance(token2, str):
+        raise WrongTypeError.with_values(token2, str)
+    if not 0.0 <= prefix_weight <= 1 / _MAX_PREFIX:
+        raise ValueError(f"prefix_weight needs to be between 0.0 and {1 / _MAX_PREFIX}")
+
+    jaro = jaro_similarity(token1, token2)
+
+    return jaro + common_prefix(token1, token2) * prefix_weight * (1.0 - jaro)
+
+def jaro_similarity(token1: str, token2: str) -> float:
+    """Calculate the jaro similarity between token1 and token2, without the winkler prefix bonus"""
+
+    if token1 == token2:
+        return 1.0
+    if len(token1) == 0 or len(token2) == 0:
+        return 0.0
+
+    # characters only match if they are at most this far apart
+    window = max(0, max(len(token1), len(token2)) // 2 - 1)
+
+    matched2 = [False] * len(token2)
+    matches1 = []
+    for i, char in enumerate(token1):
+        end = min(i + window + 1, len(token2))
+        j = token2.find(char, max(0, i - window), end)
+        while j != -1 and matched2[j]:
+            j = token2.find(char, j + 1, end)
+        if j != -1:
+            matched2[j] = True
+            matches1.append(char)
+
+    if len(matches1) == 0:
+        return 0.0
+
+    matches2 = [char for char, matched in zip(token2, matched2) if matched]
+    transpositions = sum(char1 != char2 for char1, char2 in zip(matches1, matches2)) // 2
+
+    matches = len(matches1)
+    return (matches / len(token1) + matches / len(token2) + (matches - transpositions) / matches) / 3
+
+def common_prefix(token1: str, token2: str) -> int:
+    """Return the length of the common prefix of token1 and token2, up to four characters"""
+
+    prefix = 0
+    for char1, char2 in zip(token1[:_MAX_PREFIX], token2[:_MAX_PREFIX]):
+        if char1 != char2:
+            break
+        prefix += 1
+    return prefix
@@ -1,49 +1,64 @@
 """A module containing the levenshtein_distance function"""
 
-import numpy
+import numpy as np
 
 from abllib.error import WrongTypeError
 
-def levenshtein_distance(token1: str, token2: str) -> int:
+def levenshtein_distance(token1: str, token2: str, max_dist: int | None = None) -> int:
     """
     Calculate the levenshtein distance between token1 and token2
 
     This represents the edit distance between two strings
+
+    If max_dist is given, the calculation stops as soon as the distance is known to exceed it,
+    in which case max_dist + 1 is returned.
     """
 
     if not isinstance(token1, str):
         raise WrongTypeError.with_values(token1, str)
     if not isinstance(token2, str):
         raise WrongTypeError.with_values(token2, str)
+    if max_dist is not None:
+        if not isinstance(max_dist, int):
+            raise WrongTypeError.with_values(max_dist, int)
+        if max_dist < 0:
+            raise ValueError("max_dist needs to be >= 0")
+
+    # the shorter token is used for the columns, so that memory usage only depends on its length
+    if len(token1) < len(token2):
+        token1, token2 = token2, token1
+
+    if max_dist is not None and len(token1) - len(token2) > max_dist:
+        return max_dist + 1
+
+    if len(token2) == 0:
+        return len(token1)
 
-    distances = numpy.zeros((len(token1) + 1, len(token2) + 1), dtype=int)
+    columns = np.fromiter(map(ord, token2), dtype=np.uint32, count=len(token2))
+    offsets = np.arange(len(token2) + 1, dtype=np.int64)
 
-    for t1 in range(len(token1) + 1):
-        distances[t1][0] = t1
+    # only the previous row is kept, which is updated in-place
+    row = offsets.copy()
 
-    for t2 in range(len(token2) + 1):
-        distances[0][t2] = t2
+    for t1, char in enumerate(token1, start=1):
+        # substitution (or match) from the diagonal and deletion from the row above
+        substituted = row[:-1] + (columns != ord(char))
+        np.minimum(substituted, row[1:] + 1, out=row[1:])
+        row[0] = t1
 
-    a = 0
-    b = 0
-    c = 0
+        # insertions depend on the cell to the left, which is resolved with a running minimum:
+        # row[j] = min(row[k] + (j - k)) for all k <= j
+        row -= offsets
+        np.minimum.accumulate(row, out=row)
+        row += offsets
 
-    for t1 in range(1, len(token1) + 1):
-        for t2 in range(1, len(token2) + 1):
-            if token1[t1-1] == token2[t2-1]:
-                distances[t1][t2] = distances[t1 - 1][t2 - 1]
-            else:
-                a = distances[t1][t2 - 1]
-                b = distances[t1 - 1][t2]
-                c = distances[t1 - 1][t2 - 1]
+        # the distances can never decrease in later rows
+        if max_dist is not None and row.min() > max_dist:
+            return max_dist + 1
 
-                if (a <= b and a <= c):
-                    distances[t1][t2] = a + 1
-                elif (b <= a and b <= c):
-                    distances[t1][t2] = b + 1
-                else:
-                    distances[t1][t2] = c + 1
+    # the minimum of the last row can be within max_dist while the distance itself isn't
+    if max_dist is not None:
+        return min(int(row[-1].item()), max_dist + 1)
 
-    final_dist = distances[len(token1)][len(token2)]
     # cast np.int64 to int
-    return int(final_dist.item())
+    return int(row[-1].item())
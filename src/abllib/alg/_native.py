@@ -0,0 +1,48 @@
+"""A module containing wrappers around the C implementation of the optional Levenshtein package"""
+
+import numpy as np
+
+from abllib.error import MissingRequiredModuleError
+from abllib.general import try_import_module
+
+Levenshtein = try_import_module("Levenshtein")
+
+def levenshtein_distance(token1: str, token2: str, max_dist: int | None = None) -> int:
+    """
+    Calculate the levenshtein distance between token1 and token2
+
+    This represents the edit distance between two strings
+
+    If max_dist is given, the calculation stops as soon as the distance is known to exceed it,
+    in which case max_dist + 1 is returned.
+    """
+
+    if Levenshtein is None:
+        raise MissingRequiredModuleError.with_values("Levenshtein")
+
+    if max_dist is not None and max_dist < 0:
+        raise ValueError("max_dist needs to be >= 0")
+
+    # the C implementation also returns score_cutoff + 1 if the distance is too large
+    distance: int = Levenshtein.distance(token1, token2, score_cutoff=max_dist)
+    return distance
+
+def levenshtein_many(query: str, candidates: list[str], max_dist: int | None = None) -> np.typing.NDArray[np.int64]:
+    """
+    Calculate the levenshtein distance between query and each candidate
+
+    Returns a numpy array containing the distances, in the same order as candidates.
+
+    If max_dist is given, all distances larger than max_dist are returned as max_dist + 1.
+    """
+
+    if Levenshtein is None:
+        raise MissingRequiredModuleError.with_values("Levenshtein")
+
+    if max_dist is not None and max_dist < 0:
+        raise ValueError("max_dist needs to be >= 0")
+
+    distance = Levenshtein.distance
+    return np.fromiter((distance(query, candidate, score_cutoff=max_dist) for candidate in candidates),
+                       dtype=np.int64,
+                       count=len(candidates))
@@ -0,0 +1,80 @@
+"""A module containing the bit-parallel optimal string alignment distance function"""
+
+from abllib.alg._bitparallel import _pattern_masks
+from abllib.error import WrongTypeError
+
+def osa_distance(token1: str, token2: str, max_dist: int | None = None) -> int:
+    """
+    Calculate the optimal string alignment distance between token1 and token2
+
+    This is the levenshtein distance, where swapping two adjacent characters counts as a single edit
+    (restricted Damerau-Levenshtein distance). No substring is edited more than once.
+
+    If max_dist is given, all distances larger than max_dist are returned as max_dist + 1.
+
+    Uses the bit-vector algorithm by Hyyrö (2003),
+    with python integers acting as arbitrarily long bit vectors.
+    """
+
+    if not isinstance(token1, str):
+        raise WrongTypeError.with_values(token1, str)
+    if not isinstance(token2, str):
+        raise WrongTypeError.with_values(token2, str)
+    if max_dist is not None:
+        if not isinstance(max_dist, int):
+            raise WrongTypeError.with_values(max_dist, int)
+        if max_dist < 0:
+            raise ValueError("max_dist needs to be >= 0")
+
+    # the shorter token is used as the pattern, which keeps the bit vectors small
+    if len(token1) < len(token2):
+        token1, token2 = token2, token1
+
+    if max_dist is not None and len(token1) - len(token2) > max_dist:
+        return max_dist + 1
+
+    if len(token2) == 0:
+        dist = len(token1)
+    else:
+        dist = _distance(_pattern_masks(token2), len(token2), token1)
+
+    if max_dist is not None:
+        return min(dist, max_dist + 1)
+    return dist
+
+def _distance(masks: dict[str, int], pattern_len: int, text: str) -> int:
+    """Calculate the optimal string alignment distance between the pattern described by masks and the text"""
+
+    mask = (1 << pattern_len) - 1
+    last_bit = 1 << (pattern_len - 1)
+    get_mask = masks.get
+
+    # vertical positive / negative deltas of the current column
+    vp = mask
+    vn = 0
+    d0 = 0
+    prev_eq = 0
+    score = pattern_len
+
+    for char in text:
+        eq = get_mask(char, 0)
+        # the positions where swapping the previous two characters of text results in a match
+        transpositions = ((~d0 & eq) << 1) & prev_eq
+        d0 = ((((eq & vp) + vp) ^ vp) | eq | vn | transpositions) & mask
+        hp = vn | ~(d0 | vp)
+        hn = vp & d0
+
+        if hp & last_bit:
+            score += 1
+        elif hn & last_bit:
+            score -= 1
+
+        hp = (hp << 1) | 1
+        hn = hn << 1
+
+        # python integers have infinite sign bits, so the state needs to be cut back to the pattern length
+        vp = (hn | ~(d0 | hp)) & mask
+        vn = hp & d0 & mask
+        prev_eq = eq
+
+    return score
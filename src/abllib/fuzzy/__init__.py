@@ -1,23 +1,46 @@
 """A module containing fuzzy matching-related functionality"""
 
 from abllib.fuzzy._all import match_all
+from abllib.fuzzy._async import amatch_all, amatch_closest
 from abllib.fuzzy._closest import match_closest
+from abllib.fuzzy._distance_cache import DistanceCache
+from abllib.fuzzy._index import FuzzyIndex
+from abllib.fuzzy._kernel import DamerauKernel, JaroWinklerKernel, Kernel, LevenshteinKernel, TokenSetKernel
+from abllib.fuzzy._iter import iter_matches
+from abllib.fuzzy._join import match_join
 from abllib.fuzzy._matchresult import MatchResult
+from abllib.fuzzy._normalizer import Normalizer
 from abllib.fuzzy._similarity import Similarity
+from abllib.fuzzy._top_k import match_top_k
 
-def similarity(target: str, candidate: str) -> float:
+def similarity(target: str, candidate: str, kernel: Kernel | None = None) -> float:
     """
     Checks how closely two strings match. (Version 2)
 
     Returns a float value between 0.0 and 1.0 (inclusive), where 1.0 is a perfect match.
+
+    If a kernel is given, it is used instead of the levenshtein distance.
     """
 
-    return Similarity(target, candidate).calculate()
+    return Similarity(target, candidate, kernel=kernel).calculate()
 
 __exports__ = [
+    amatch_all,
+    amatch_closest,
+    DamerauKernel,
+    DistanceCache,
+    FuzzyIndex,
+    iter_matches,
+    JaroWinklerKernel,
+    Kernel,
+    LevenshteinKernel,
     match_all,
     match_closest,
+    match_join,
+    match_top_k,
     MatchResult,
+    Normalizer,
     Similarity,
-    similarity
+    similarity,
+    TokenSetKernel
 ]
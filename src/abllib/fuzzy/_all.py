@@ -1,9 +1,12 @@
 """A module containing the fuzzy search function"""
 
+from abllib.fuzzy._index import FuzzyIndex
 from abllib.fuzzy._matchresult import MatchResult
-from abllib.fuzzy._similarity import Similarity
 
-def match_all(target: str, candidates: list[str | tuple[str, ...]], threshold: int = 5) -> list[MatchResult]:
+def match_all(target: str,
+              candidates: list[str | tuple[str, ...]],
+              threshold: int = 5,
+              workers: int = 1) -> list[MatchResult]:
     """
     Search for all candidates matching the target. Applies fuzzy logic when comparing.
 
@@ -11,6 +14,9 @@ def match_all(target: str, candidates: list[str | tuple[str, ...]], threshold: i
     * the edit distance (levenshtein distance) needs to be smaller than *threshold*
     * a single word (*target* split at ' ') needs to have an edit distance smaller than (len(*word*) / 3) + 1
 
+    If workers is larger than 1, the candidates are split into chunks which are scored in separate processes.
+    Pass -1 to use all available cpu cores. The results are the same as if calculated in a single process.
+
     Returns a list of MatchResults.
     """
 
@@ -19,23 +25,4 @@ def match_all(target: str, candidates: list[str | tuple[str, ...]], threshold: i
     if threshold < 0:
         raise ValueError("Threshold needs to be >= 0")
 
-    results = []
-    for i, candidate in enumerate(candidates):
-        curr_result = _match_single_candidate(target, candidate, threshold)
-        if curr_result is not None:
-            results.append(MatchResult(curr_result.score, curr_result.value, i, curr_result.inner_index))
-
-    return results
-
-def _match_single_candidate(target: str, candidate: str | tuple[str, ...], threshold: int) -> MatchResult | None:
-    if isinstance(candidate, str):
-        score = Similarity(target, candidate, threshold).calculate()
-        return MatchResult(score, candidate) if score > 0.0 else None
-
-    result = MatchResult(0.0)
-    for i, inner_candidate in enumerate(candidate):
-        score = Similarity(target, inner_candidate, threshold).calculate()
-        if score > result.score:
-            result = MatchResult(score, candidate, inner_index=i)
-
-    return result if result.score > 0.0 else None
+    return FuzzyIndex(candidates).match_all(target, threshold, workers)
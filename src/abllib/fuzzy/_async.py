@@ -0,0 +1,91 @@
+"""A module containing the asyncio versions of the fuzzy search functions"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+
+from abllib.error import WrongTypeError
+from abllib.fuzzy._all import match_all
+from abllib.fuzzy._closest import match_closest
+from abllib.fuzzy._index import FuzzyIndex
+from abllib.fuzzy._matchresult import MatchResult
+
+# pylint: disable=protected-access
+
+async def amatch_all(target: str,
+                     candidates: list[str | tuple[str, ...]],
+                     threshold: int = 5,
+                     chunk_size: int = 1024,
+                     executor: Executor | None = None) -> list[MatchResult]:
+    """
+    Search for all candidates matching the target. Applies fuzzy logic when comparing.
+
+    Works exactly like fuzzy.match_all, but doesn't block the event loop:
+    * if an executor is given, the whole search runs in it
+    * otherwise, the candidates are searched in chunks of chunk_size, and control is returned to the event loop
+      after each chunk
+
+    Returns a list of MatchResults.
+    """
+
+    _check_args(threshold, chunk_size, executor)
+
+    if executor is not None:
+        return await asyncio.get_running_loop().run_in_executor(executor,
+                                                                partial(match_all, target, candidates, threshold))
+
+    results = []
+    for offset in range(0, len(candidates), chunk_size):
+        chunk = candidates[offset:offset + chunk_size]
+        for i, score, inner_index in FuzzyIndex(chunk)._score_candidates(target, threshold):
+            results.append(MatchResult(score, chunk[i], offset + i, inner_index))
+
+        # let other tasks run between chunks
+        await asyncio.sleep(0)
+
+    return results
+
+async def amatch_closest(target: str,
+                         candidates: list[str | tuple[str, ...]],
+                         threshold: int = 5,
+                         chunk_size: int = 1024,
+                         executor: Executor | None = None) -> MatchResult:
+    """
+    Match the target to the most similar candidate. Applies fuzzy logic when comparing.
+
+    Works exactly like fuzzy.match_closest, but doesn't block the event loop:
+    * if an executor is given, the whole search runs in it
+    * otherwise, the candidates are searched in chunks of chunk_size, and control is returned to the event loop
+      after each chunk
+
+    Returns a MatchResult
+    """
+
+    _check_args(threshold, chunk_size, executor)
+
+    if executor is not None:
+        return await asyncio.get_running_loop().run_in_executor(executor,
+                                                                partial(match_closest, target, candidates, threshold))
+
+    best = MatchResult(0.0)
+    for offset in range(0, len(candidates), chunk_size):
+        chunk = candidates[offset:offset + chunk_size]
+        for i, score, inner_index in FuzzyIndex(chunk)._score_top_k(target, 1, threshold):
+            # only a higher score replaces the result, so that the first candidate with the best score is kept
+            if score > best.score:
+                best = MatchResult(score, chunk[i], offset + i, inner_index)
+
+        # let other tasks run between chunks
+        await asyncio.sleep(0)
+
+    return best
+
+def _check_args(threshold: int, chunk_size: int, executor: Executor | None) -> None:
+    if threshold < 0:
+        raise ValueError("Threshold needs to be >= 0")
+    if not isinstance(chunk_size, int):
+        raise WrongTypeError.with_values(chunk_size, int)
+    if chunk_size < 1:
+        raise ValueError("chunk_size needs to be >= 1")
+    if executor is not None and not isinstance(executor, Executor):
+        raise WrongTypeError.with_values(executor, Executor)
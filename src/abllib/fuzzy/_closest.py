@@ -1,7 +1,7 @@
 """A module containing the fuzzy match function"""
 
+from abllib.fuzzy._index import FuzzyIndex
 from abllib.fuzzy._matchresult import MatchResult
-from abllib.fuzzy._similarity import Similarity
 
 def match_closest(target: str, candidates: list[str | tuple[str, ...]], threshold: int = 5) -> MatchResult:
     """
@@ -21,23 +21,4 @@ def match_closest(target: str, candidates: list[str | tuple[str, ...]], threshol
     if threshold < 0:
         raise ValueError("Threshold needs to be >= 0")
 
-    result = MatchResult(0.0)
-    for i, candidate in enumerate(candidates):
-        curr_result = _matches_single_candidate(target, candidate, threshold)
-        if curr_result.score > result.score:
-            result = MatchResult(curr_result.score, curr_result.value, i, curr_result.inner_index)
-
-    return result
-
-def _matches_single_candidate(target: str, candidate: str | tuple[str, ...], threshold: int) -> MatchResult:
-    if isinstance(candidate, str):
-        score = Similarity(target, candidate, threshold).calculate()
-        return MatchResult(score, candidate)
-
-    result = MatchResult(0.0)
-    for i, inner_candidate in enumerate(candidate):
-        score = Similarity(target, inner_candidate, threshold).calculate()
-        if score > result.score:
-            result = MatchResult(score, candidate, inner_index=i)
-
-    return result
+    return FuzzyIndex(candidates).match_closest(target, threshold)
@@ -0,0 +1,156 @@
+"""Module containing the _DistanceCache class"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from abllib.alg import levenshtein_distance, levenshtein_many
+from abllib.error import WrongTypeError
+
+class _DistanceCache():
+    """
+    A bounded, thread-safe cache for the edit distances between two words.
+
+    If the cache is full, the least recently used distance is removed.
+    """
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        self._validate_maxsize(maxsize)
+
+        self._maxsize = maxsize
+        self._cache: OrderedDict[tuple[str, str, int], int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, word1: str, word2: str, max_dist: int) -> int:
+        """
+        Return the levenshtein distance between word1 and word2, calculating it if it isn't cached yet.
+
+        Distances larger than max_dist are returned as max_dist + 1.
+        """
+
+        # the distance is symmetric, so the order of the words doesn't matter
+        key = (word1, word2, max_dist) if word1 <= word2 else (word2, word1, max_dist)
+
+        with self._lock:
+            dist = self._cache.get(key)
+            if dist is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return dist
+            self._misses += 1
+
+        # calculate outside of the lock, so that other threads aren't blocked
+        dist = levenshtein_distance(word1, word2, max_dist)
+
+        with self._lock:
+            if self._maxsize > 0:
+                self._cache[key] = dist
+                if len(self._cache) > self._maxsize:
+                    self._cache.popitem(last=False)
+
+        return dist
+
+    def get_many(self,
+                 words1: list[str],
+                 words2: list[str],
+                 max_dists: np.typing.NDArray[np.int64]) -> np.typing.NDArray[np.int64]:
+        """
+        Return the levenshtein distance between each pair of words1[i] and words2[i],
+        calculating the ones which aren't cached yet.
+
+        Distances larger than their max_dists[i] are returned as max_dists[i] + 1.
+        """
+
+        keys = [(word1, word2, max_dist) if word1 <= word2 else (word2, word1, max_dist)
+                for word1, word2, max_dist in zip(words1, words2, max_dists.tolist())]
+        dists = np.empty(len(keys), dtype=np.int64)
+        # the missing indexes, grouped by their first word
+        missing: dict[str, list[int]] = {}
+
+        with self._lock:
+            cache = self._cache
+            for i, key in enumerate(keys):
+                dist = cache.get(key)
+                if dist is None:
+                    missing.setdefault(words1[i], []).append(i)
+                else:
+                    cache.move_to_end(key)
+                    dists[i] = dist
+            misses = sum(len(indexes) for indexes in missing.values())
+            self._hits += len(keys) - misses
+            self._misses += misses
+
+        if misses == 0:
+            return dists
+
+        # calculate the missing distances outside of the lock, with one call per word
+        for word1, indexes in missing.items():
+            group_max_dists = max_dists[indexes]
+            group_dists = levenshtein_many(word1, [words2[i] for i in indexes], int(group_max_dists.max()))
+            dists[indexes] = np.minimum(group_dists, group_max_dists + 1)
+
+        with self._lock:
+            if self._maxsize > 0:
+                for indexes in missing.values():
+                    for i in indexes:
+                        self._cache[keys[i]] = int(dists[i])
+                while len(self._cache) > self._maxsize:
+                    self._cache.popitem(last=False)
+
+        return dists
+
+    def clear(self) -> None:
+        """Remove all cached distances and reset the hits and misses counters"""
+
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Change the maximum number of cached distances.
+
+        If the cache currently holds more distances, the least recently used ones are removed.
+
+        A maxsize of 0 disables the cache.
+        """
+
+        self._validate_maxsize(maxsize)
+
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._cache) > maxsize:
+                self._cache.popitem(last=False)
+
+    @property
+    def hits(self) -> int:
+        """The number of distances that were served from the cache"""
+
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """The number of distances that needed to be calculated"""
+
+        return self._misses
+
+    @property
+    def maxsize(self) -> int:
+        """The maximum number of cached distances"""
+
+        return self._maxsize
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _validate_maxsize(self, maxsize: int) -> None:
+        if not isinstance(maxsize, int):
+            raise WrongTypeError.with_values(maxsize, int)
+        if maxsize < 0:
+            raise ValueError("maxsize needs to be >= 0")
+
+DistanceCache = _DistanceCache()
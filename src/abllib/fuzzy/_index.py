@@ -0,0 +1,909 @@
+"""Module containing the FuzzyIndex class"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import pathlib
+from dataclasses import dataclass
+from itertools import chain, compress, groupby
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator, Literal
+
+import numpy as np
+
+from abllib import fs
+from abllib.error import DirNotFoundError, KeyNotFoundError, WrongTypeError
+from abllib.fuzzy._distance_cache import DistanceCache
+from abllib.fuzzy._kernel import Kernel, default_kernel, kernel_from_dict, kernel_to_dict
+from abllib.fuzzy._matchresult import MatchResult
+from abllib.fuzzy._normalizer import Normalizer
+from abllib.fuzzy._prefilter import build_profiles, lower_bounds
+from abllib.fuzzy._similarity import Similarity
+from abllib.fuzzy._snapshot import (CandidateTable, StringTable, encode_strings, read_arrays,
+                                    write_arrays)
+from abllib.pproc import WorkerProcess
+
+# pylint: disable=protected-access
+
+# each candidate stores a float64 score and an int64 inner_index in shared memory
+_SHARED_ITEMSIZE = np.dtype(np.float64).itemsize + np.dtype(np.int64).itemsize
+
+class FuzzyIndex():
+    """
+    A precompiled index over a list of candidates, which can be searched many times.
+
+    Every candidate is split into its words once when the index is built,
+    instead of on every call to match_all / match_closest.
+
+    Before comparing, candidates which can't reach a score above 0.0 are filtered out using cheap lower bounds.
+
+    If a normalizer is given, each candidate is normalized once when the index is built,
+    and each target is normalized once per search. The MatchResults still contain the original candidates.
+
+    Candidates can be added, removed and updated without rebuilding the index.
+    The indexes of all other candidates stay the same, removed candidates are only marked as removed.
+    Once removed and replaced entries outnumber the other entries, the index is rebuilt without them.
+
+    If a kernel other than the LevenshteinKernel is given, it is used to calculate all scores.
+    The lower bounds are only valid for the levenshtein distance, so all candidates are compared in that case.
+    """
+
+    def __init__(self,
+                 candidates: list[str | tuple[str, ...]],
+                 normalizer: Normalizer | None = None,
+                 kernel: Kernel | None = None) -> None:
+        if normalizer is not None and not isinstance(normalizer, Normalizer):
+            raise WrongTypeError.with_values(normalizer, Normalizer)
+
+        self._candidates: list[str | tuple[str, ...]] | CandidateTable = list(candidates)
+        self._normalizer = normalizer
+        self._kernel = default_kernel(kernel)
+        self._removed: set[int] = set()
+
+        # each str candidate and each item of a tuple candidate is stored as an entry
+        entry_texts: list[str] = []
+        entry_candidate: list[int] = []
+        entry_inner: list[int] = []
+
+        for i, candidate in enumerate(self._candidates):
+            for inner_candidate, inner_index in self._split_candidate(candidate):
+                entry_texts.append(inner_candidate)
+                entry_candidate.append(i)
+                entry_inner.append(inner_index)
+
+        self._build_entries(entry_texts, entry_candidate, entry_inner)
+        self._build_vocabulary()
+
+    def _build_entries(self, entry_texts: list[str], entry_candidate: list[int], entry_inner: list[int]) -> None:
+        """Build the entry arrays and the words from the given entries, which need to be sorted by candidate"""
+
+        words: list[str] = []
+        word_offsets = [0]
+        for text in entry_texts:
+            words.extend(text.split(" "))
+            word_offsets.append(len(words))
+
+        self._entry_texts: list[str] | StringTable = entry_texts
+        self._words: list[str] | StringTable = words
+
+        # the candidate of each entry
+        self._entry_candidate = np.array(entry_candidate, dtype=np.int64)
+        # the entries of candidate i are entries[candidate_starts[i]:candidate_ends[i]]
+        # an updated candidate gets new entries at the end, so the entries are only sorted by candidate until then
+        candidate_ids = np.arange(len(self._candidates), dtype=np.int64)
+        self._candidate_starts = np.searchsorted(self._entry_candidate, candidate_ids, side="left")
+        self._candidate_ends = np.searchsorted(self._entry_candidate, candidate_ids, side="right")
+        # the index within its tuple candidate, or -1 if the candidate is a str
+        self._entry_inner = np.array(entry_inner, dtype=np.int64)
+        self._entry_lengths = np.fromiter((len(text) for text in entry_texts), dtype=np.int64, count=len(entry_texts))
+        # the entries of removed candidates are kept, but never matched
+        self._entry_alive = np.ones(len(entry_texts), dtype=np.bool_)
+        self._dead_entries = 0
+        # the words of entry i are words[word_offsets[i]:word_offsets[i + 1]]
+        self._word_offsets = np.array(word_offsets, dtype=np.int64)
+
+        self._entry_char_hists, self._entry_qgram_hists = build_profiles(entry_texts)
+
+    def match_all(self, target: str, threshold: int = 5, workers: int = 1) -> list[MatchResult]:
+        """
+        Search for all candidates matching the target. Applies fuzzy logic when comparing.
+
+        Works exactly like fuzzy.match_all, using the candidates this index was built with.
+
+        Returns a list of MatchResults.
+        """
+
+        if threshold < 0:
+            raise ValueError("Threshold needs to be >= 0")
+        if not isinstance(workers, int):
+            raise WrongTypeError.with_values(workers, int)
+        if workers == -1:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers needs to be >= 1 or -1")
+
+        target = self._normalize(target)
+
+        if workers > 1:
+            return self._match_all_parallel(target, threshold, workers)
+
+        results = []
+        for i, score, inner_index in self._score_candidates(target, threshold):
+            results.append(MatchResult(score, self._candidates[i], i, inner_index))
+
+        return results
+
+    def match_closest(self, target: str, threshold: int = 5) -> MatchResult:
+        """
+        Match the target to the most similar candidate. Applies fuzzy logic when comparing.
+
+        Works exactly like fuzzy.match_closest, using the candidates this index was built with.
+
+        Returns a MatchResult
+        """
+
+        if threshold < 0:
+            raise ValueError("Threshold needs to be >= 0")
+
+        # the best candidate with the lowest index is the same as the first candidate with the best score
+        for i, score, inner_index in self._score_top_k(self._normalize(target), 1, threshold):
+            return MatchResult(score, self._candidates[i], i, inner_index)
+
+        return MatchResult(0.0)
+
+    def match_top_k(self, target: str, k: int, threshold: int = 5) -> list[MatchResult]:
+        """
+        Search for the k candidates most similar to the target. Applies fuzzy logic when comparing.
+
+        Works exactly like fuzzy.match_top_k, using the candidates this index was built with.
+
+        Returns a list of at most k MatchResults, sorted by descending score.
+        """
+
+        if threshold < 0:
+            raise ValueError("Threshold needs to be >= 0")
+        if not isinstance(k, int):
+            raise WrongTypeError.with_values(k, int)
+        if k < 0:
+            raise ValueError("k needs to be >= 0")
+        if k == 0:
+            return []
+
+        results = []
+        for i, score, inner_index in self._score_top_k(self._normalize(target), k, threshold):
+            results.append(MatchResult(score, self._candidates[i], i, inner_index))
+
+        return results
+
+    def match_join(self,
+                   targets: list[str],
+                   threshold: int = 5,
+                   mode: Literal["closest"] | Literal["all"] = "closest") \
+                   -> list[MatchResult] | list[list[MatchResult]]:
+        """
+        Match each target to the candidates. Applies fuzzy logic when comparing.
+
+        Works exactly like fuzzy.match_join, using the candidates this index was built with.
+
+        Returns a list with one entry per target, which is either a MatchResult or a list of MatchResults.
+        """
+
+        if threshold < 0:
+            raise ValueError("Threshold needs to be >= 0")
+        if mode not in ("closest", "all"):
+            raise ValueError(f"mode needs to be 'closest' or 'all', not '{mode}'")
+        if not isinstance(targets, list):
+            raise WrongTypeError.with_values(targets, list)
+
+        # the matched words of each target word are reused for all targets
+        word_matches = _WordMatches({}, {})
+        # duplicate targets are only scored once
+        scored_targets: dict[str, list[tuple[int, float, int | None]]] = {}
+
+        results: list = []
+        for target in targets:
+            target = self._normalize(target)
+            scored = scored_targets.get(target)
+            if scored is None:
+                if mode == "all":
+                    scored = list(self._score_candidates(target, threshold, word_matches))
+                else:
+                    scored = self._score_top_k(target, 1, threshold, word_matches)
+                scored_targets[target] = scored
+
+            matches = [MatchResult(score, self._candidates[i], i, inner_index) for i, score, inner_index in scored]
+            if mode == "all":
+                results.append(matches)
+            else:
+                results.append(matches[0] if len(matches) > 0 else MatchResult(0.0))
+
+        return results
+
+    def add(self, candidate: str | tuple[str, ...]) -> int:
+        """
+        Add a candidate to the index, and return its index.
+
+        Only the words of the new candidate are processed, the rest of the index is updated in place.
+        """
+
+        index = len(self._candidates)
+        self._candidates.append(candidate)
+
+        start, end = self._append_entries(index, candidate)
+        self._candidate_starts = _extend(self._candidate_starts, [start])
+        self._candidate_ends = _extend(self._candidate_ends, [end])
+
+        return index
+
+    def remove(self, index: int) -> None:
+        """
+        Remove the candidate at index. The indexes of all other candidates stay the same.
+
+        Raises a KeyNotFoundError if there is no candidate at index.
+        """
+
+        self._check_index(index)
+
+        self._entry_alive[self._candidate_starts[index]:self._candidate_ends[index]] = False
+        self._dead_entries += int(self._candidate_ends[index] - self._candidate_starts[index])
+        self._removed.add(index)
+        self._compact_if_needed()
+
+    def update(self, index: int, candidate: str | tuple[str, ...]) -> None:
+        """
+        Replace the candidate at index with a new candidate.
+
+        Raises a KeyNotFoundError if there is no candidate at index.
+        """
+
+        self._check_index(index)
+
+        self._entry_alive[self._candidate_starts[index]:self._candidate_ends[index]] = False
+        self._dead_entries += int(self._candidate_ends[index] - self._candidate_starts[index])
+        self._candidates[index] = candidate
+        self._candidate_starts[index], self._candidate_ends[index] = self._append_entries(index, candidate)
+        self._compact_if_needed()
+
+    def save(self, path: str | pathlib.Path) -> None:
+        """
+        Save the index to a file, which can be loaded with FuzzyIndex.load.
+
+        The file contains the arrays of the index in a flat binary layout, and no pickled python objects.
+        """
+
+        full_path = fs.absolute(path)
+        if not os.path.isdir(os.path.dirname(full_path)):
+            raise DirNotFoundError.with_values(os.path.dirname(full_path))
+
+        items: list[str] = []
+        item_offsets = [0]
+        for candidate in self._candidates:
+            items.extend([candidate] if isinstance(candidate, str) else candidate)
+            item_offsets.append(len(items))
+        item_codepoints, item_string_offsets = encode_strings(items)
+        entry_codepoints, entry_string_offsets = encode_strings(self._entry_texts)
+        word_starts, word_ends = self._word_positions(entry_string_offsets)
+        vocab_codepoints, vocab_string_offsets = encode_strings(self._vocab_words)
+        vocab_entries, vocab_offsets = self._merged_postings()
+
+        arrays: dict[str, np.typing.NDArray] = {
+            "item_codepoints": item_codepoints,
+            "item_string_offsets": item_string_offsets,
+            "item_offsets": np.array(item_offsets, dtype=np.int64),
+            "candidate_is_tuple": np.array([not isinstance(candidate, str) for candidate in self._candidates],
+                                           dtype=np.bool_),
+            "candidate_starts": self._candidate_starts,
+            "candidate_ends": self._candidate_ends,
+            "removed": np.array(sorted(self._removed), dtype=np.int64),
+            "entry_codepoints": entry_codepoints,
+            "entry_string_offsets": entry_string_offsets,
+            "entry_candidate": self._entry_candidate,
+            "entry_inner": self._entry_inner,
+            "entry_lengths": self._entry_lengths,
+            "entry_alive": self._entry_alive,
+            "entry_char_hists": self._entry_char_hists,
+            "entry_qgram_hists": self._entry_qgram_hists,
+            "word_offsets": self._word_offsets,
+            "word_starts": word_starts,
+            "word_ends": word_ends,
+            "vocab_codepoints": vocab_codepoints,
+            "vocab_string_offsets": vocab_string_offsets,
+            "vocab_lengths": self._vocab_lengths,
+            "vocab_entries": vocab_entries,
+            "vocab_offsets": vocab_offsets,
+            "vocab_char_hists": self._vocab_char_hists,
+            "vocab_qgram_hists": self._vocab_qgram_hists
+        }
+        metadata = {
+            "type": "FuzzyIndex",
+            "normalizer": None if self._normalizer is None else self._normalizer._options(),
+            "kernel": None if self._kernel is None else kernel_to_dict(self._kernel)
+        }
+
+        write_arrays(full_path, arrays, metadata)
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path, mmap: bool = True) -> FuzzyIndex:
+        """
+        Load an index which was saved with FuzzyIndex.save.
+
+        If mmap is True, the arrays are memory-mapped instead of read into memory,
+        so that multiple processes loading the same file share a single copy.
+        The candidates and their words also stay in the file, and each string is only decoded when it is used.
+        Changes to the loaded index are never written back to the file.
+        """
+
+        arrays, metadata = read_arrays(fs.absolute(path), mmap)
+        if metadata.get("type") != "FuzzyIndex":
+            raise ValueError(f"'{path}' doesn't contain a FuzzyIndex")
+
+        index = cls.__new__(cls)
+        index._normalizer = None if metadata["normalizer"] is None else Normalizer(**metadata["normalizer"])
+        index._kernel = None if metadata["kernel"] is None else kernel_from_dict(metadata["kernel"])
+
+        # the strings are only decoded when they are used, so that they aren't copied into each process
+        items = StringTable(arrays["item_codepoints"],
+                            arrays["item_string_offsets"][:-1],
+                            arrays["item_string_offsets"][1:])
+        index._candidates = CandidateTable(items, arrays["item_offsets"], arrays["candidate_is_tuple"])
+        index._removed = set(arrays["removed"].tolist())
+        index._candidate_starts = arrays["candidate_starts"]
+        index._candidate_ends = arrays["candidate_ends"]
+
+        index._entry_texts = StringTable(arrays["entry_codepoints"],
+                                         arrays["entry_string_offsets"][:-1],
+                                         arrays["entry_string_offsets"][1:])
+        # the words are stored as positions within the entry texts
+        index._words = StringTable(arrays["entry_codepoints"], arrays["word_starts"], arrays["word_ends"])
+        index._entry_candidate = arrays["entry_candidate"]
+        index._entry_inner = arrays["entry_inner"]
+        index._entry_lengths = arrays["entry_lengths"]
+        index._entry_alive = arrays["entry_alive"]
+        index._dead_entries = int(np.count_nonzero(~index._entry_alive))
+        index._entry_char_hists = arrays["entry_char_hists"]
+        index._entry_qgram_hists = arrays["entry_qgram_hists"]
+        index._word_offsets = arrays["word_offsets"]
+
+        index._vocab_words = StringTable(arrays["vocab_codepoints"],
+                                         arrays["vocab_string_offsets"][:-1],
+                                         arrays["vocab_string_offsets"][1:])
+        # the ids of the words are only needed when adding candidates
+        index._vocab_ids = None
+        index._vocab_lengths = arrays["vocab_lengths"]
+        index._vocab_entries = arrays["vocab_entries"]
+        index._vocab_offsets = arrays["vocab_offsets"]
+        index._vocab_added = {}
+        index._vocab_char_hists = arrays["vocab_char_hists"]
+        index._vocab_qgram_hists = arrays["vocab_qgram_hists"]
+
+        return index
+
+    def _word_positions(self, entry_string_offsets: np.typing.NDArray[np.int64]) \
+                        -> tuple[np.typing.NDArray[np.int64], np.typing.NDArray[np.int64]]:
+        """Return the start and end of each word within the concatenated entry texts"""
+
+        word_starts = np.empty(len(self._words), dtype=np.int64)
+        word_ends = np.empty(len(self._words), dtype=np.int64)
+        word_i = 0
+        for text, pos in zip(self._entry_texts, entry_string_offsets.tolist()):
+            # the words are separated by a single space each
+            for word in text.split(" "):
+                word_starts[word_i] = pos
+                pos += len(word)
+                word_ends[word_i] = pos
+                pos += 1
+                word_i += 1
+
+        return word_starts, word_ends
+
+    def __len__(self) -> int:
+        return len(self._candidates) - len(self._removed)
+
+    def _check_index(self, index: int) -> None:
+        if not isinstance(index, int):
+            raise WrongTypeError.with_values(index, int)
+        if not 0 <= index < len(self._candidates) or index in self._removed:
+            raise KeyNotFoundError.with_values(index)
+
+    def _split_candidate(self, candidate: str | tuple[str, ...]) -> list[tuple[str, int]]:
+        """Return the normalized text and inner_index of each entry, where an inner_index of -1 means None"""
+
+        if isinstance(candidate, str):
+            inner_candidates = [(candidate, -1)]
+        elif isinstance(candidate, (tuple, list)):
+            inner_candidates = [(inner_candidate, i) for i, inner_candidate in enumerate(candidate)]
+            for inner_candidate, _ in inner_candidates:
+                if not isinstance(inner_candidate, str):
+                    raise WrongTypeError.with_values(inner_candidate, str)
+        else:
+            raise WrongTypeError.with_values(candidate, (str, tuple))
+
+        if self._normalizer is not None:
+            inner_candidates = [(self._normalizer(text), i) for text, i in inner_candidates]
+
+        return inner_candidates
+
+    def _append_entries(self, candidate_i: int, candidate: str | tuple[str, ...]) -> tuple[int, int]:
+        """Append the entries of the given candidate, and return their start and end"""
+
+        start = len(self._entry_texts)
+        inner_candidates = self._split_candidate(candidate)
+        texts = [text for text, _ in inner_candidates]
+
+        word_offsets = []
+        for text in texts:
+            self._words.extend(text.split(" "))
+            word_offsets.append(len(self._words))
+        self._entry_texts.extend(texts)
+
+        self._entry_candidate = _extend(self._entry_candidate, [candidate_i] * len(texts))
+        self._entry_inner = _extend(self._entry_inner, [inner_index for _, inner_index in inner_candidates])
+        self._entry_lengths = _extend(self._entry_lengths, [len(text) for text in texts])
+        self._entry_alive = _extend(self._entry_alive, [True] * len(texts))
+        self._word_offsets = _extend(self._word_offsets, word_offsets)
+
+        char_hists, qgram_hists = build_profiles(texts)
+        self._entry_char_hists = _extend(self._entry_char_hists, char_hists)
+        self._entry_qgram_hists = _extend(self._entry_qgram_hists, qgram_hists)
+
+        self._add_to_vocabulary(range(start, len(self._entry_texts)))
+
+        return start, len(self._entry_texts)
+
+    def _compact_if_needed(self) -> None:
+        """
+        Delete the entries of removed and updated candidates, once they outnumber the other entries.
+
+        The index is rebuilt from the remaining entries, which takes time proportional to their number.
+        As at least as many candidates need to change before the next rebuild, this takes amortized constant time.
+        """
+
+        if self._dead_entries <= len(self._entry_texts) - self._dead_entries:
+            return
+
+        entries = np.flatnonzero(self._entry_alive)
+        entries = entries[np.argsort(self._entry_candidate[entries], kind="stable")]
+        self._build_entries([self._entry_texts[entry] for entry in entries.tolist()],
+                            self._entry_candidate[entries].tolist(),
+                            self._entry_inner[entries].tolist())
+        self._build_vocabulary()
+
+    def _normalize(self, target: str) -> str:
+        """Return the target normalized the same way as the candidates"""
+
+        if not isinstance(target, str):
+            raise WrongTypeError.with_values(target, str)
+
+        if self._normalizer is None:
+            return target
+        return self._normalizer(target)
+
+    def _build_vocabulary(self) -> None:
+        """Assign an id to each distinct word, and store the entries in which each word occurs"""
+
+        vocab: dict[str, int] = {}
+        word_ids = np.fromiter((vocab.setdefault(word, len(vocab)) for word in self._words),
+                               dtype=np.int64,
+                               count=len(self._words))
+
+        self._vocab_ids: dict[str, int] | None = vocab
+        self._vocab_words: list[str] | StringTable = list(vocab.keys())
+        self._vocab_lengths = np.fromiter((len(word) for word in self._vocab_words),
+                                          dtype=np.int64,
+                                          count=len(self._vocab_words))
+
+        # the entries containing word i are vocab_entries[vocab_offsets[i]:vocab_offsets[i + 1]]
+        word_entries = np.repeat(np.arange(len(self._entry_texts), dtype=np.int64), np.diff(self._word_offsets))
+        order = np.argsort(word_ids, kind="stable")
+        self._vocab_entries = word_entries[order]
+        self._vocab_offsets = np.zeros(len(self._vocab_words) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(word_ids, minlength=len(self._vocab_words)), out=self._vocab_offsets[1:])
+
+        # the entries containing each word which were added later
+        self._vocab_added: dict[int, list[int]] = {}
+
+        self._vocab_char_hists, self._vocab_qgram_hists = build_profiles(self._vocab_words)
+
+    def _add_to_vocabulary(self, entries: range) -> None:
+        """Add the words of the given new entries to the vocabulary"""
+
+        if self._vocab_ids is None:
+            self._vocab_ids = {word: vocab_id for vocab_id, word in enumerate(self._vocab_words)}
+
+        new_words = []
+        for entry in entries:
+            for word in self._words[self._word_offsets[entry]:self._word_offsets[entry + 1]]:
+                vocab_id = self._vocab_ids.get(word)
+                if vocab_id is None:
+                    vocab_id = len(self._vocab_words)
+                    self._vocab_ids[word] = vocab_id
+                    self._vocab_words.append(word)
+                    new_words.append(word)
+                self._vocab_added.setdefault(vocab_id, []).append(entry)
+
+        if len(new_words) == 0:
+            return
+
+        # the new words aren't contained in vocab_entries
+        self._vocab_offsets = _extend(self._vocab_offsets, [self._vocab_offsets[-1]] * len(new_words))
+        self._vocab_lengths = _extend(self._vocab_lengths, [len(word) for word in new_words])
+        char_hists, qgram_hists = build_profiles(new_words)
+        self._vocab_char_hists = _extend(self._vocab_char_hists, char_hists)
+        self._vocab_qgram_hists = _extend(self._vocab_qgram_hists, qgram_hists)
+
+    def _merged_postings(self) -> tuple[np.typing.NDArray[np.int64], np.typing.NDArray[np.int64]]:
+        """Return vocab_entries and vocab_offsets, which also contain the entries added later"""
+
+        if len(self._vocab_added) == 0:
+            return self._vocab_entries, self._vocab_offsets
+
+        word_ids = np.repeat(np.arange(len(self._vocab_words), dtype=np.int64), np.diff(self._vocab_offsets))
+        added_ids = list(self._vocab_added.keys())
+        added_counts = [len(self._vocab_added[vocab_id]) for vocab_id in added_ids]
+        word_ids = np.concatenate((word_ids, np.repeat(np.array(added_ids, dtype=np.int64), added_counts)))
+        word_entries = np.concatenate((self._vocab_entries,
+                                       np.fromiter(chain.from_iterable(self._vocab_added.values()),
+                                                   dtype=np.int64,
+                                                   count=sum(added_counts))))
+
+        order = np.argsort(word_ids, kind="stable")
+        vocab_offsets = np.zeros(len(self._vocab_words) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(word_ids, minlength=len(self._vocab_words)), out=vocab_offsets[1:])
+        return word_entries[order], vocab_offsets
+
+    def _match_all_parallel(self, target: str, threshold: int, workers: int) -> list[MatchResult]:
+        """Score the candidates in multiple worker processes, and return the same results as match_all"""
+
+        target_words = target.split(" ")
+        prefiltered = self._prefilter(target, target_words, threshold)
+        chunks = self._split_entries(prefiltered.entries, workers)
+
+        # the worker processes write their results directly into shared memory
+        # size can't be 0, even if there are no candidates
+        shm = SharedMemory(create=True, size=max(1, len(self._candidates) * _SHARED_ITEMSIZE))
+        try:
+            scores, inner_indexes = _shared_results(shm, len(self._candidates))
+            scores[:] = 0.0
+
+            processes: list[WorkerProcess] = []
+            for chunk in chunks:
+                process = WorkerProcess(target=_score_into_shared_memory,
+                                        args=(shm.name, self, target, target_words, threshold, prefiltered, chunk),
+                                        daemon=True)
+                process.start()
+                processes.append(process)
+
+            for process in processes:
+                process.join(reraise=True)
+
+            results = []
+            for i in np.flatnonzero(scores > 0.0).tolist():
+                inner_index = int(inner_indexes[i])
+                results.append(MatchResult(float(scores[i]),
+                                           self._candidates[i],
+                                           i,
+                                           None if inner_index == -1 else inner_index))
+
+            # the arrays need to be released before the shared memory can be closed
+            del scores, inner_indexes
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return results
+
+    def _split_entries(self, entries: np.typing.NDArray[np.int64], chunks: int) -> list[np.typing.NDArray[np.int64]]:
+        """Split entries into at most the given number of chunks of nearly equal size, without splitting a candidate"""
+
+        if len(entries) == 0:
+            return []
+
+        entry_candidate = self._entry_candidate[entries]
+        bounds = np.linspace(0, len(entries), chunks + 1).astype(np.int64)
+        # move each bound to the first entry of its candidate
+        bounds[1:-1] = np.searchsorted(entry_candidate, entry_candidate[bounds[1:-1]], side="left")
+
+        return [entries[start:end] for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()) if end > start]
+
+    def _score_top_k(self,
+                     target: str,
+                     k: int,
+                     threshold: int,
+                     word_matches: _WordMatches | None = None) -> list[tuple[int, float, int | None]]:
+        """
+        Return the index, score and inner_index of the k best candidates with a score above 0.0,
+        sorted by descending score and ascending index.
+        """
+
+        target_words = target.split(" ")
+        prefiltered = self._prefilter(target, target_words, threshold, word_matches)
+        entries = prefiltered.entries
+
+        # the upper bound of a candidate is the largest upper bound of its entries
+        # the scores are rounded, so the bounds need to be rounded the same way
+        candidate_bounds = np.zeros(len(self._candidates), dtype=np.float64)
+        np.maximum.at(candidate_bounds, self._entry_candidate[entries], np.round(prefiltered.score_bounds[entries], 2))
+
+        # visit the candidates with the highest upper bound first, and the lower index on ties
+        entry_candidates = self._entry_candidate[entries]
+        candidate_ids = np.unique(entry_candidates)
+        order = np.lexsort((candidate_ids, -candidate_bounds[candidate_ids]))
+
+        # the heap contains (score, -index, inner_index), so the worst result is on top
+        heap: list[tuple[float, int, int | None]] = []
+        for candidate_i in candidate_ids[order].tolist():
+            # no remaining candidate can beat the worst result
+            if len(heap) == k and (candidate_bounds[candidate_i], -candidate_i) < heap[0][:2]:
+                break
+
+            start, end = np.searchsorted(entry_candidates, (candidate_i, candidate_i + 1))
+            score, inner_index = self._score_entries(target,
+                                                     target_words,
+                                                     entries[start:end].tolist(),
+                                                     threshold,
+                                                     prefiltered)
+            if score == 0.0:
+                continue
+
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -candidate_i, inner_index))
+            elif (score, -candidate_i) > heap[0][:2]:
+                heapq.heapreplace(heap, (score, -candidate_i, inner_index))
+
+        heap.sort(key=lambda item: (-item[0], -item[1]))
+        return [(-neg_index, score, inner_index) for score, neg_index, inner_index in heap]
+
+    def _score_candidates(self,
+                          target: str,
+                          threshold: int,
+                          word_matches: _WordMatches | None = None) -> Iterator[tuple[int, float, int | None]]:
+        """Yield the index, best score and its inner_index for each candidate with a score above 0.0"""
+
+        target_words = target.split(" ")
+        prefiltered = self._prefilter(target, target_words, threshold, word_matches)
+
+        return self._score_prefiltered(target, target_words, threshold, prefiltered, prefiltered.entries)
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
+    def _score_prefiltered(self,
+                           target: str,
+                           target_words: list[str],
+                           threshold: int,
+                           prefiltered: _Prefiltered,
+                           entries: np.typing.NDArray[np.int64]) -> Iterator[tuple[int, float, int | None]]:
+        """Yield the index, best score and its inner_index for each candidate of entries with a score above 0.0"""
+
+        # the entries of each candidate are next to each other
+        for candidate_i, candidate_entries in groupby(entries.tolist(), key=self._entry_candidate.item):
+            score, inner_index = self._score_entries(target,
+                                                     target_words,
+                                                     list(candidate_entries),
+                                                     threshold,
+                                                     prefiltered)
+            if score > 0.0:
+                yield (candidate_i, score, inner_index)
+
+    def _score_entries(self,
+                       target: str,
+                       target_words: list[str],
+                       entries: list[int],
+                       threshold: int,
+                       prefiltered: _Prefiltered) -> tuple[float, int | None]:
+        """Return the best score and its inner_index of the given entries, which belong to the same candidate"""
+
+        best_score = 0.0
+        best_inner = None
+        for entry in entries:
+            text = self._entry_texts[entry]
+            # the words of an entry are always its text split at each space
+            score = Similarity._from_words(target,
+                                           target_words,
+                                           text,
+                                           text.split(" "),
+                                           threshold,
+                                           prefiltered.word_dists,
+                                           self._kernel).calculate()
+            if score > best_score:
+                best_score = score
+                best_inner = None if self._entry_inner[entry] == -1 else int(self._entry_inner[entry])
+
+        return best_score, best_inner
+
+    def _prefilter(self,
+                   target: str,
+                   target_words: list[str],
+                   threshold: int,
+                   word_matches: _WordMatches | None = None) -> _Prefiltered:
+        """
+        Find all entries which could reach a score above 0.0, and an upper bound for the score of each entry.
+
+        An entry can only get a score above 0.0 if either its whole text could be within threshold of target,
+        or if one of its words is within the allowed distance of one of the target words.
+
+        Cheap lower bounds for the edit distance are used to skip most entries and words.
+        The distances of the remaining words are calculated once, so that Similarity only needs to look them up.
+
+        If word_matches is given, the matched words are reused across multiple calls with the same threshold.
+        """
+
+        if self._kernel is not None:
+            # the lower bounds are only valid for the levenshtein distance
+            score_bounds = self._entry_alive.astype(np.float64)
+            entries = np.flatnonzero(self._entry_alive)
+            entries = entries[np.argsort(self._entry_candidate[entries], kind="stable")]
+            return _Prefiltered(entries, score_bounds, None)
+
+        # the whole target and entry are compared in Similarity._calculate_simple
+        simple_bounds = np.zeros(len(self._entry_texts), dtype=np.float64)
+        target_char_hist, target_qgram_hist = build_profiles([target])
+        entries = np.flatnonzero(np.abs(self._entry_lengths - len(target)) <= threshold)
+        dists = lower_bounds(self._entry_char_hists[entries],
+                             self._entry_qgram_hists[entries],
+                             self._entry_lengths[entries],
+                             target_char_hist[0],
+                             target_qgram_hist[0],
+                             len(target))
+        within = dists <= threshold
+        entries = entries[within]
+        max_lengths = np.maximum(self._entry_lengths[entries], len(target))
+        simple_bounds[entries] = (max_lengths - dists[within]) / np.maximum(max_lengths, 1)
+
+        # the single words are compared in Similarity._construct_scores_array
+        # the best score of each word over all target words, or -1.0 if it isn't within any allowed distance
+        if word_matches is None:
+            word_matches = _WordMatches({}, {})
+        vocab_scores = np.full(len(self._vocab_words), -1.0, dtype=np.float64)
+        for target_word in dict.fromkeys(target_words):
+            if target_word not in word_matches.vocab:
+                word_matches.vocab[target_word] = self._match_word(target_word, threshold, word_matches.word_dists)
+            vocab_ids, word_scores = word_matches.vocab[target_word]
+            vocab_scores[vocab_ids] = np.maximum(vocab_scores[vocab_ids], word_scores)
+
+        # count the matched words of each entry, and find their best score
+        vocab_ids = np.flatnonzero(vocab_scores >= 0.0)
+        starts = self._vocab_offsets[vocab_ids]
+        counts = self._vocab_offsets[vocab_ids + 1] - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        word_entries = self._vocab_entries[positions]
+        word_entry_scores = np.repeat(vocab_scores[vocab_ids], counts)
+        if len(self._vocab_added) > 0:
+            added_ids = [vocab_id for vocab_id in vocab_ids.tolist() if vocab_id in self._vocab_added]
+            added_counts = [len(self._vocab_added[vocab_id]) for vocab_id in added_ids]
+            added_entries = np.fromiter(chain.from_iterable(self._vocab_added[vocab_id] for vocab_id in added_ids),
+                                        dtype=np.int64,
+                                        count=sum(added_counts))
+            word_entries = np.concatenate((word_entries, added_entries))
+            word_entry_scores = np.concatenate((word_entry_scores, np.repeat(vocab_scores[added_ids], added_counts)))
+        word_hits = np.bincount(word_entries, minlength=len(self._entry_texts))
+        best_word_scores = np.zeros(len(self._entry_texts), dtype=np.float64)
+        np.maximum.at(best_word_scores, word_entries, word_entry_scores)
+
+        # the complex score sums at most one word score per word of the shorter side,
+        # and only matched words can have a score above 0.0
+        word_counts = np.diff(self._word_offsets)
+        min_word_counts = np.minimum(word_counts, len(target_words))
+        max_word_counts = np.maximum(word_counts, len(target_words))
+        complex_bounds = np.minimum(min_word_counts, word_hits) * best_word_scores / max_word_counts
+
+        score_bounds = np.maximum(simple_bounds, complex_bounds)
+        score_bounds[~self._entry_alive] = 0.0
+
+        # the entries of updated candidates are at the end, so they need to be sorted by candidate
+        entries = np.flatnonzero(score_bounds > 0.0)
+        entries = entries[np.argsort(self._entry_candidate[entries], kind="stable")]
+
+        return _Prefiltered(entries, score_bounds, word_matches.word_dists)
+
+    def _match_word(self,
+                    target_word: str,
+                    threshold: int,
+                    word_dists: dict[tuple[str, str], int]) -> tuple[np.typing.NDArray[np.int64],
+                                                                     np.typing.NDArray[np.float64]]:
+        """
+        Return all vocabulary words within the allowed distance of target_word, and their scores.
+
+        Their distances are added to word_dists.
+        """
+
+        max_dist_by_target = min((len(target_word) // 3) + 1, threshold)
+        max_allowed_dists = np.minimum((self._vocab_lengths // 3) + 1, max_dist_by_target)
+        vocab_ids = np.flatnonzero(np.abs(self._vocab_lengths - len(target_word)) <= max_allowed_dists)
+
+        word_char_hists, word_qgram_hists = build_profiles([target_word])
+        dists = lower_bounds(self._vocab_char_hists[vocab_ids],
+                             self._vocab_qgram_hists[vocab_ids],
+                             self._vocab_lengths[vocab_ids],
+                             word_char_hists[0],
+                             word_qgram_hists[0],
+                             len(target_word))
+        vocab_ids = vocab_ids[dists <= max_allowed_dists[vocab_ids]]
+
+        words = [self._vocab_words[vocab_id] for vocab_id in vocab_ids.tolist()]
+        # the same word pairs occur very often, so their distances are cached
+        dists = DistanceCache.get_many([target_word] * len(words), words, max_allowed_dists[vocab_ids])
+        within = dists <= max_allowed_dists[vocab_ids]
+        for word, dist in zip(compress(words, within.tolist()), dists[within].tolist()):
+            # Similarity could swap target and candidate
+            word_dists[(target_word, word)] = dist
+            word_dists[(word, target_word)] = dist
+
+        vocab_ids = vocab_ids[within]
+        max_lengths = np.maximum(self._vocab_lengths[vocab_ids], len(target_word))
+        # two empty words have no similar chars
+        return vocab_ids, (max_lengths - dists[within]) / np.maximum(max_lengths, 1)
+
+# pylint: disable-next=too-many-arguments, too-many-positional-arguments
+def _score_into_shared_memory(shm_name: str,
+                              index: FuzzyIndex,
+                              target: str,
+                              target_words: list[str],
+                              threshold: int,
+                              prefiltered: _Prefiltered,
+                              entries: np.typing.NDArray[np.int64]) -> None:
+    shm = SharedMemory(name=shm_name)
+    try:
+        scores, inner_indexes = _shared_results(shm, len(index._candidates))
+        for i, score, inner_index in index._score_prefiltered(target, target_words, threshold, prefiltered, entries):
+            scores[i] = score
+            inner_indexes[i] = -1 if inner_index is None else inner_index
+        # the arrays need to be released before the shared memory can be closed
+        del scores, inner_indexes
+    finally:
+        shm.close()
+
+def _extend(array: np.typing.NDArray, values: np.typing.ArrayLike) -> np.typing.NDArray:
+    """
+    Return array with values appended to it.
+
+    The returned array is a view of a larger buffer, which is reused by later calls.
+    The buffer grows exponentially, so that appending takes amortized O(len(values)).
+    """
+
+    values = np.asarray(values, dtype=array.dtype)
+    size = len(array)
+    new_size = size + len(values)
+
+    buffer = array.base
+    # array is only a view at the start of a buffer if it was returned from this function
+    if not isinstance(buffer, np.ndarray) \
+       or buffer.dtype != array.dtype \
+       or buffer.shape[1:] != array.shape[1:] \
+       or buffer.ctypes.data != array.ctypes.data \
+       or len(buffer) < new_size:
+        buffer = np.empty((max(new_size, 2 * size),) + array.shape[1:], dtype=array.dtype)
+        buffer[:size] = array
+
+    buffer[size:new_size] = values
+    return buffer[:new_size]
+
+def _shared_results(shm: SharedMemory,
+                    size: int) -> tuple[np.typing.NDArray[np.float64], np.typing.NDArray[np.int64]]:
+    """Return the score and inner_index arrays stored in shm, where an inner_index of -1 means None"""
+
+    scores: np.typing.NDArray[np.float64] = np.ndarray((size,), dtype=np.float64, buffer=shm.buf)
+    inner_indexes: np.typing.NDArray[np.int64] = np.ndarray((size,),
+                                                             dtype=np.int64,
+                                                             buffer=shm.buf,
+                                                             offset=size * np.dtype(np.float64).itemsize)
+    return scores, inner_indexes
+
+@dataclass
+class _Prefiltered():
+    """The result of FuzzyIndex._prefilter"""
+
+    # all entries which could reach a score above 0.0, sorted by candidate
+    entries: np.typing.NDArray[np.int64]
+    # an upper bound for the score of each entry
+    score_bounds: np.typing.NDArray[np.float64]
+    # the distances of all word pairs which are within their allowed distance, or None if a kernel is used
+    word_dists: dict[tuple[str, str], int] | None
+
+@dataclass
+class _WordMatches():
+    """The matched vocabulary words of target words, which can be shared across multiple targets"""
+
+    # the vocabulary ids and scores of all words within the allowed distance of each target word
+    vocab: dict[str, tuple[np.typing.NDArray[np.int64], np.typing.NDArray[np.float64]]]
+    # the distances of all word pairs which are within their allowed distance
+    word_dists: dict[tuple[str, str], int]
@@ -0,0 +1,52 @@
+"""A module containing the streaming fuzzy search function"""
+
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from abllib.error import WrongTypeError
+from abllib.fuzzy._index import FuzzyIndex
+from abllib.fuzzy._matchresult import MatchResult
+
+# pylint: disable=protected-access
+
+# the first chunks are small, so that the first results are found quickly
+_FIRST_CHUNK_SIZE = 16
+# later chunks are larger, so that the prefilter can skip more candidates at once
+_MAX_CHUNK_SIZE = 4096
+
+def iter_matches(target: str, candidates: Iterable[str | tuple[str, ...]], threshold: int = 5) -> Iterator[MatchResult]:
+    """
+    Search for all candidates matching the target. Applies fuzzy logic when comparing.
+
+    Candidates are matched with the same conditions as in match_all,
+    but candidates can be any iterable, e.g. a generator reading from a file.
+
+    The candidates are read in chunks, so only a bounded number of them is held in memory at once.
+
+    Returns a generator which yields MatchResults as soon as they are found, in the same order as match_all.
+    """
+
+    if not isinstance(target, str):
+        raise WrongTypeError.with_values(target, str)
+    # a str is iterable, but would be matched character by character
+    if isinstance(candidates, str) or not isinstance(candidates, Iterable):
+        raise WrongTypeError.with_values(candidates, Iterable)
+    if threshold < 0:
+        raise ValueError("Threshold needs to be >= 0")
+
+    return _iter_matches(target, iter(candidates), threshold)
+
+def _iter_matches(target: str, candidates: Iterator[str | tuple[str, ...]], threshold: int) -> Iterator[MatchResult]:
+    offset = 0
+    chunk_size = _FIRST_CHUNK_SIZE
+
+    while True:
+        chunk = list(islice(candidates, chunk_size))
+        if len(chunk) == 0:
+            return
+
+        for i, score, inner_index in FuzzyIndex(chunk)._score_candidates(target, threshold):
+            yield MatchResult(score, chunk[i], offset + i, inner_index)
+
+        offset += len(chunk)
+        chunk_size = min(chunk_size * 2, _MAX_CHUNK_SIZE)
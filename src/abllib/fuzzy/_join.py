@@ -0,0 +1,34 @@
+"""A module containing the fuzzy join function"""
+
+from typing import Literal
+
+from abllib.error import WrongTypeError
+from abllib.fuzzy._index import FuzzyIndex
+from abllib.fuzzy._matchresult import MatchResult
+
+def match_join(targets: list[str],
+               candidates: list[str | tuple[str, ...]],
+               threshold: int = 5,
+               mode: Literal["closest"] | Literal["all"] = "closest") -> list[MatchResult] | list[list[MatchResult]]:
+    """
+    Match each target to the candidates. Applies fuzzy logic when comparing.
+
+    Candidates are matched with the same conditions as in match_all.
+
+    The candidates are only split into words and indexed once, and the word distances are shared across all targets,
+    which is a lot faster than calling match_closest or match_all for each target.
+
+    If mode is 'closest', returns a list with the same MatchResult as match_closest for each target.
+    If mode is 'all', returns a list with the same list of MatchResults as match_all for each target.
+    """
+
+    if not isinstance(targets, list):
+        raise WrongTypeError.with_values(targets, list)
+    if not isinstance(candidates, list):
+        raise WrongTypeError.with_values(candidates, list)
+    if threshold < 0:
+        raise ValueError("Threshold needs to be >= 0")
+    if mode not in ("closest", "all"):
+        raise ValueError(f"mode needs to be 'closest' or 'all', not '{mode}'")
+
+    return FuzzyIndex(candidates).match_join(targets, threshold, mode)
@@ -0,0 +1,205 @@
+"""Module containing the scoring kernels used by Similarity"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+import numpy as np
+
+from abllib.alg import jaro_winkler_similarity, levenshtein_distance, osa_distance
+from abllib.alg._jaro import common_prefix
+from abllib.error import WrongTypeError
+
+# pylint: disable=protected-access
+
+class Kernel(ABC):
+    """
+    Base class of the scoring kernels used by Similarity.
+
+    A kernel scores the whole target and candidate, and optionally each pair of their words.
+    The scores need to be between 0.0 and 1.0 (inclusive), and must not change if target and candidate are swapped.
+    """
+
+    # if True, Similarity also compares the single words and searches for their best combination
+    compares_words = True
+
+    @abstractmethod
+    def score(self, target: str, candidate: str, threshold: int) -> float:
+        """Return the score of the whole target and candidate"""
+
+    def word_score(self, target_word: str, candidate_word: str, threshold: int) -> float:
+        """Return the score of a single target word and candidate word"""
+
+        return self.score(target_word, candidate_word, threshold)
+
+    def scores_array(self, targets: list[str], candidates: list[str], threshold: int) -> np.typing.NDArray:
+        """Return the score of each target word and candidate word, see Similarity.scores_array"""
+
+        scores = np.zeros((len(targets), len(candidates)), dtype=np.float64)
+        for i_target, target_word in enumerate(targets):
+            for i_candidate, candidate_word in enumerate(candidates):
+                scores[i_target, i_candidate] = self.word_score(target_word, candidate_word, threshold)
+        return scores
+
+    def _options(self) -> dict[str, Any]:
+        """Return the arguments needed to create an equal kernel"""
+
+        return {}
+
+class LevenshteinKernel(Kernel):
+    """
+    The default kernel, which scores using the levenshtein distance.
+
+    The whole target and candidate need to be within threshold,
+    and each word needs to be within (len(word) / 3) + 1 (but at most threshold).
+    """
+
+    def distance(self, token1: str, token2: str, max_dist: int) -> int:
+        """Return the edit distance between token1 and token2, or max_dist + 1 if it is larger than max_dist"""
+
+        return levenshtein_distance(token1, token2, max_dist)
+
+    def score(self, target: str, candidate: str, threshold: int) -> float:
+        return self._score(target, candidate, threshold)
+
+    def word_score(self, target_word: str, candidate_word: str, threshold: int) -> float:
+        # two empty words have no similar chars
+        if len(target_word) == 0 and len(candidate_word) == 0:
+            return 0.0
+
+        max_allowed_dist = min((len(target_word) // 3) + 1, (len(candidate_word) // 3) + 1, threshold)
+        return self._score(target_word, candidate_word, max_allowed_dist)
+
+    def _score(self, token1: str, token2: str, max_dist: int) -> float:
+        max_len = max(len(token1), len(token2))
+        if max_len == 0:
+            return 1.0
+
+        dist = self.distance(token1, token2, max_dist)
+        if dist > max_dist:
+            return 0.0
+        return (max_len - dist) / max_len
+
+class DamerauKernel(LevenshteinKernel):
+    """
+    A kernel which works like the LevenshteinKernel,
+    but swapping two adjacent characters counts as a single edit (optimal string alignment distance).
+
+    This helps with typos like 'teh' instead of 'the', which otherwise count as two edits.
+    """
+
+    def distance(self, token1: str, token2: str, max_dist: int) -> int:
+        return osa_distance(token1, token2, max_dist)
+
+class JaroWinklerKernel(Kernel):
+    """
+    A kernel which scores using the jaro-winkler similarity, which works well for short strings like codes or names.
+
+    Scores below min_score are returned as 0.0. The threshold isn't used.
+    Most non-matches are rejected using an upper bound calculated from their lengths and common prefix,
+    without calculating the similarity itself.
+    """
+
+    def __init__(self, min_score: float = 0.8, prefix_weight: float = 0.1) -> None:
+        if not isinstance(min_score, (int, float)):
+            raise WrongTypeError.with_values(min_score, float)
+        if not 0.0 <= min_score <= 1.0:
+            raise ValueError("min_score needs to be between 0.0 and 1.0")
+        if not isinstance(prefix_weight, (int, float)):
+            raise WrongTypeError.with_values(prefix_weight, float)
+        if not 0.0 <= prefix_weight <= 0.25:
+            raise ValueError("prefix_weight needs to be between 0.0 and 0.25")
+
+        self._min_score = float(min_score)
+        self._prefix_weight = float(prefix_weight)
+
+    def score(self, target: str, candidate: str, threshold: int) -> float:
+        if target == candidate:
+            return 1.0
+
+        min_len = min(len(target), len(candidate))
+        if min_len == 0:
+            return 0.0
+
+        # at most min_len characters can match, and there are no transpositions in the best case
+        max_jaro = (min_len / len(target) + min_len / len(candidate) + 1.0) / 3
+        prefix_bonus = common_prefix(target, candidate) * self._prefix_weight
+        if max_jaro + prefix_bonus * (1.0 - max_jaro) < self._min_score:
+            return 0.0
+
+        score = jaro_winkler_similarity(target, candidate, self._prefix_weight)
+        return score if score >= self._min_score else 0.0
+
+    def _options(self) -> dict[str, Any]:
+        return {"min_score": self._min_score, "prefix_weight": self._prefix_weight}
+
+class TokenSetKernel(Kernel):
+    """
+    A kernel which ignores the order and duplicates of words.
+
+    The words contained in both target and candidate are sorted and compared to
+    the same words followed by the remaining words of target / candidate, using the levenshtein distance.
+    If all words of one side are contained in the other, the score is 1.0.
+
+    Only the whole target and candidate are compared, the words aren't compared individually.
+    """
+
+    compares_words = False
+
+    def score(self, target: str, candidate: str, threshold: int) -> float:
+        words1 = set(target.split())
+        words2 = set(candidate.split())
+
+        common_words = sorted(words1 & words2)
+        common = " ".join(common_words)
+        combined1 = " ".join(common_words + sorted(words1 - words2))
+        combined2 = " ".join(common_words + sorted(words2 - words1))
+
+        best_score = 0.0
+        for token1, token2 in ((common, combined1), (common, combined2), (combined1, combined2)):
+            if len(token1) == 0 or len(token2) == 0:
+                continue
+
+            max_len = max(len(token1), len(token2))
+            dist = levenshtein_distance(token1, token2, threshold)
+            if dist <= threshold:
+                best_score = max(best_score, (max_len - dist) / max_len)
+
+        return best_score
+
+# the kernels which can be saved together with a FuzzyIndex
+_KERNEL_TYPES: dict[str, type[Kernel]] = {
+    kernel_type.__name__: kernel_type
+    for kernel_type in (LevenshteinKernel, DamerauKernel, JaroWinklerKernel, TokenSetKernel)
+}
+
+def kernel_to_dict(kernel: Kernel) -> dict[str, Any]:
+    """Return a json-serializable description of kernel, which can be restored with kernel_from_dict"""
+
+    if _KERNEL_TYPES.get(type(kernel).__name__) is not type(kernel):
+        raise ValueError(f"Kernel {type(kernel).__name__} can't be saved, only the built-in kernels can")
+
+    return {"type": type(kernel).__name__, "options": kernel._options()}
+
+def kernel_from_dict(data: dict[str, Any]) -> Kernel:
+    """Return the kernel described by data"""
+
+    return _KERNEL_TYPES[data["type"]](**data["options"])
+
+def default_kernel(kernel: Kernel | None) -> Kernel | None:
+    """
+    Return None if kernel is the LevenshteinKernel, which Similarity implements without a kernel object.
+
+    Raises a WrongTypeError if kernel isn't a Kernel.
+    """
+
+    if kernel is None:
+        return None
+    if not isinstance(kernel, Kernel):
+        raise WrongTypeError.with_values(kernel, Kernel)
+    # subclasses can change the distance, so they need to be used as kernels
+    # pylint: disable-next=unidiomatic-typecheck
+    if type(kernel) is LevenshteinKernel:
+        return None
+    return kernel
@@ -2,7 +2,8 @@
 
 from dataclasses import dataclass
 
-@dataclass
+# slots make each instance a lot smaller, as many of them are created when matching against large lists
+@dataclass(slots=True)
 class MatchResult():
     """Dataclass representing a single matched candidate"""
 
@@ -0,0 +1,74 @@
+"""Module containing the Normalizer class"""
+
+import unicodedata
+
+from abllib.error import WrongTypeError
+from abllib.fs.filename import _sanitize_letters
+
+class Normalizer():
+    """
+    Normalizes strings before they are compared, so that e.g. 'Café!' matches 'cafe'.
+
+    The following steps are applied in order, each of which can be disabled:
+    * transliterate: convert letters like german umlauts or japanese characters, as in fs.sanitize
+    * casefold: convert to lowercase, also handling cases like 'ß' -> 'ss'
+    * strip_accents: decompose characters (NFKD) and remove the accents
+    * collapse_punctuation: replace punctuation with spaces, and collapse all whitespace into single spaces
+    """
+
+    __slots__ = ("_transliterate", "_casefold", "_strip_accents", "_collapse_punctuation")
+
+    def __init__(self,
+                 casefold: bool = True,
+                 strip_accents: bool = True,
+                 collapse_punctuation: bool = True,
+                 transliterate: bool = False) -> None:
+        self._transliterate = transliterate
+        self._casefold = casefold
+        self._strip_accents = strip_accents
+        self._collapse_punctuation = collapse_punctuation
+
+    def __call__(self, text: str) -> str:
+        """Return the normalized text"""
+
+        if not isinstance(text, str):
+            raise WrongTypeError.with_values(text, str)
+
+        if self._transliterate:
+            text = _sanitize_letters(text)
+
+        if self._casefold:
+            text = text.casefold()
+
+        # ascii text doesn't contain any accents
+        if self._strip_accents and not text.isascii():
+            text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+        if self._collapse_punctuation:
+            text = " ".join(text.translate(_PUNCTUATION_TABLE).split())
+
+        return text
+
+    def _options(self) -> dict[str, bool]:
+        """Return the arguments needed to create an equal Normalizer"""
+
+        return {
+            "casefold": self._casefold,
+            "strip_accents": self._strip_accents,
+            "collapse_punctuation": self._collapse_punctuation,
+            "transliterate": self._transliterate
+        }
+
+    def __repr__(self) -> str:
+        return f"Normalizer(casefold={self._casefold}, strip_accents={self._strip_accents}, " \
+               f"collapse_punctuation={self._collapse_punctuation}, transliterate={self._transliterate})"
+
+class _PunctuationTable(dict):
+    """A str.translate table replacing all unicode punctuation with spaces, which is filled as characters occur"""
+
+    def __missing__(self, key: int) -> int:
+        value = ord(" ") if unicodedata.category(chr(key)).startswith("P") else key
+        self[key] = value
+        return value
+
+_PUNCTUATION_TABLE = _PunctuationTable()
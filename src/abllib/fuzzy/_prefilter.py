@@ -0,0 +1,74 @@
+"""Module containing cheap lower bounds for the edit distance, used to skip hopeless candidates"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+# characters and q-grams are hashed into this many buckets
+BUCKETS = 32
+# the length of the q-grams
+Q = 2
+
+# texts are processed in chunks, to limit the size of temporary arrays
+_CHUNK_SIZE = 65536
+# q-gram counts are stored as uint16, so they could saturate in longer texts
+_MAX_QGRAM_TEXT_LEN = 65535
+
+def build_profiles(texts: Sequence[str]) -> tuple[np.typing.NDArray[np.uint8], np.typing.NDArray[np.uint16]]:
+    """
+    Return the bucketed character histogram and q-gram histogram of each text.
+
+    They are used to calculate lower bounds for the edit distance between two texts,
+    which are much cheaper than calculating the distance itself.
+    """
+
+    char_hists = np.zeros((len(texts), BUCKETS), dtype=np.uint8)
+    qgram_hists = np.zeros((len(texts), BUCKETS), dtype=np.uint16)
+
+    for start in range(0, len(texts), _CHUNK_SIZE):
+        chunk = texts[start:start + _CHUNK_SIZE]
+        lengths = np.fromiter((len(text) for text in chunk), dtype=np.int64, count=len(chunk))
+        codepoints = np.frombuffer("".join(chunk).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        codepoints = codepoints.astype(np.int64)
+        rows = np.repeat(np.arange(len(chunk), dtype=np.int64), lengths)
+
+        # saturating the counts only weakens the lower bound
+        counts = np.bincount(rows * BUCKETS + codepoints % BUCKETS, minlength=len(chunk) * BUCKETS)
+        char_hists[start:start + len(chunk)] = np.minimum(counts, 255).reshape(-1, BUCKETS)
+
+        # q-grams must not span two texts
+        same_text = rows[1:] == rows[:-1]
+        qgrams = (codepoints[:-1] * 31 + codepoints[1:]) % BUCKETS
+        counts = np.bincount(rows[:-1][same_text] * BUCKETS + qgrams[same_text], minlength=len(chunk) * BUCKETS)
+        qgram_hists[start:start + len(chunk)] = np.minimum(counts, 65535).reshape(-1, BUCKETS)
+
+    return char_hists, qgram_hists
+
+def lower_bounds(char_hists: np.typing.NDArray[np.uint8],
+                 qgram_hists: np.typing.NDArray[np.uint16],
+                 lengths: np.typing.NDArray[np.int64],
+                 target_char_hist: np.typing.NDArray[np.uint8],
+                 target_qgram_hist: np.typing.NDArray[np.uint16],
+                 target_len: int) -> np.typing.NDArray[np.int64]:
+    """
+    Return a lower bound for the edit distance between each text and the target.
+
+    The real edit distance is guaranteed to be at least as large.
+    """
+
+    bounds = np.abs(lengths - target_len)
+
+    # each edit removes at most one surplus character, and adds at most one missing character
+    diff = char_hists.astype(np.int32) - target_char_hist.astype(np.int32)
+    surplus = np.clip(diff, 0, None).sum(axis=1)
+    missing = np.clip(-diff, 0, None).sum(axis=1)
+    np.maximum(bounds, np.maximum(surplus, missing), out=bounds)
+
+    # each edit destroys at most Q q-grams (Ukkonen, 1992)
+    # bucket collisions can only overestimate the shared q-grams
+    max_lengths = np.maximum(lengths, target_len)
+    shared = np.minimum(qgram_hists, target_qgram_hist).sum(axis=1, dtype=np.int64)
+    destroyed = np.where(max_lengths > _MAX_QGRAM_TEXT_LEN, 0, max_lengths - Q + 1 - shared)
+    np.maximum(bounds, -(-destroyed // Q), out=bounds)
+
+    return bounds
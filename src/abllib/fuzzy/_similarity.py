@@ -1,21 +1,69 @@
 """Module containing the similarity function"""
 
+from __future__ import annotations
+
 import numpy as np
 
 from abllib import error
 from abllib.alg import levenshtein_distance
+from abllib.fuzzy._distance_cache import DistanceCache
+from abllib.fuzzy._kernel import Kernel, default_kernel
+
+# below this number of cells, the scores_array is faster to construct without vectorization
+_MIN_VECTORIZED_CELLS = 16
 
 class Similarity():
     """
     Checks how closely two strings match. (Version 2)
 
     Returns a float value between 0.0 and 1.0 (inclusive), where 1.0 is a perfect match.
+
+    If a kernel is given, it is used to score the whole strings and their words, instead of the levenshtein distance.
     """
 
-    def __init__(self, target: str, candidate: str, threshold: int = 5) -> None:
-        targets = target.split(" ")
-        candidates = candidate.split(" ")
+    __slots__ = ("_target",
+                 "_candidate",
+                 "_targets",
+                 "_candidates",
+                 "_threshold",
+                 "_word_dists",
+                 "_kernel",
+                 "_scores_array")
+
+    def __init__(self, target: str, candidate: str, threshold: int = 5, kernel: Kernel | None = None) -> None:
+        self._setup(target, target.split(" "), candidate, candidate.split(" "), threshold, None, default_kernel(kernel))
+
+    @classmethod
+    def _from_words(cls,
+                    target: str,
+                    targets: list[str],
+                    candidate: str,
+                    candidates: list[str],
+                    threshold: int,
+                    word_dists: dict[tuple[str, str], int] | None = None,
+                    kernel: Kernel | None = None) -> Similarity:
+        """
+        Create a Similarity from already split words, which skips splitting target and candidate again
+
+        If word_dists is given, it needs to contain the distances of all word pairs within their max_allowed_dist.
+        They are then looked up instead of being calculated.
+
+        The kernel needs to be None instead of a LevenshteinKernel.
+        """
 
+        similarity = cls.__new__(cls)
+        similarity._setup(target, targets, candidate, candidates, threshold, word_dists, kernel)
+        return similarity
+
+    # pylint: disable-next=too-many-arguments, too-many-positional-arguments
+    def _setup(self,
+               target: str,
+               targets: list[str],
+               candidate: str,
+               candidates: list[str],
+               threshold: int,
+               word_dists: dict[tuple[str, str], int] | None,
+               kernel: Kernel | None) -> None:
         # ensure that targets is always smaller than candidates
         if len(targets) > len(candidates):
             target, candidate = candidate, target
@@ -28,8 +76,19 @@ class Similarity():
         self._candidates = candidates
 
         self._threshold = threshold
+        self._word_dists = word_dists
+        self._kernel = kernel
 
-        self.scores_array = self._construct_scores_array()
+        # the scores_array is only constructed if it is needed
+        self._scores_array: np.typing.NDArray | None = None
+
+    @property
+    def scores_array(self) -> np.typing.NDArray:
+        """The score of each target word and candidate word, see _construct_scores_array"""
+
+        if self._scores_array is None:
+            self._scores_array = self._construct_scores_array()
+        return self._scores_array
 
     def _construct_scores_array(self) -> np.typing.NDArray:
         """
@@ -41,36 +100,104 @@ class Similarity():
         such that scores[2][3] == 0.8.
         """
 
+        if self._kernel is not None:
+            return self._kernel.scores_array(self._targets, self._candidates, self._threshold)
+
+        if len(self._targets) * len(self._candidates) < _MIN_VECTORIZED_CELLS:
+            return self._construct_scores_array_small()
+
+        target_lens = np.fromiter((len(word) for word in self._targets), dtype=np.int64, count=len(self._targets))
+        candidate_lens = np.fromiter((len(word) for word in self._candidates),
+                                     dtype=np.int64,
+                                     count=len(self._candidates))
+
+        max_dists_by_target = np.minimum((target_lens // 3) + 1, self._threshold)
+        max_allowed_dists = np.minimum.outer(max_dists_by_target, (candidate_lens // 3) + 1)
+
+        edit_dists = self._construct_edit_dists(target_lens, candidate_lens, max_allowed_dists)
+
+        # we take either inner_target or inner_candidate, depending on which has more characters
+        # this ensures that swapping target and candidate results in the same score
+        max_inner_lens = np.maximum.outer(target_lens, candidate_lens)
+        similar_chars = max_inner_lens - edit_dists
+        # two empty words have no similar chars
+        divisors = np.maximum(max_inner_lens, 1)
+
+        return np.where(edit_dists <= max_allowed_dists, similar_chars / divisors, 0.0)
+
+    def _construct_scores_array_small(self) -> np.typing.NDArray:
+        """Construct the scores_array cell by cell, which is faster for small arrays"""
+
         scores_array = np.full((len(self._targets), len(self._candidates)), fill_value=0.0)
 
-        # construct scores_array 2d array
         for i_target, inner_target in enumerate(self._targets):
+            max_dist_by_target = min((len(inner_target) // 3) + 1, self._threshold)
             for i_candidate, inner_candidate in enumerate(self._candidates):
-                edit_dist = levenshtein_distance(inner_target, inner_candidate)
-
-                max_dist_by_target = (len(inner_target) // 3) + 1
                 max_dist_by_candidate = (len(inner_candidate) // 3) + 1
-                max_allowed_dist = min(max_dist_by_target, max_dist_by_candidate, self._threshold)
-
-                # check if edit distance is within bounds
-                if edit_dist <= max_allowed_dist:
-                    # we take either inner_target or inner_candidate, depending on which has more characters
-                    # this ensures that swapping target and candidate results in the same score
-                    max_inner_len = max(len(inner_target), len(inner_candidate))
-                    similar_chars = max_inner_len - edit_dist
-                    divisor = max_inner_len
-                    score = similar_chars / divisor
-                    scores_array[i_target][i_candidate] = score
+                max_allowed_dist = min(max_dist_by_target, max_dist_by_candidate)
+
+                if self._word_dists is not None:
+                    # word pairs which aren't contained are outside of their max_allowed_dist
+                    edit_dist = self._word_dists.get((inner_target, inner_candidate), max_allowed_dist + 1)
+                else:
+                    # the same word pairs occur very often, so their distances are cached
+                    edit_dist = DistanceCache.get(inner_target, inner_candidate, max_allowed_dist)
+
+                # we take either inner_target or inner_candidate, depending on which has more characters
+                # this ensures that swapping target and candidate results in the same score
+                max_inner_len = max(len(inner_target), len(inner_candidate))
+
+                # check if edit distance is within bounds, two empty words have no similar chars
+                if edit_dist <= max_allowed_dist and max_inner_len > 0:
+                    scores_array[i_target][i_candidate] = (max_inner_len - edit_dist) / max_inner_len
 
         return scores_array
 
+    def _construct_edit_dists(self,
+                              target_lens: np.typing.NDArray[np.int64],
+                              candidate_lens: np.typing.NDArray[np.int64],
+                              max_allowed_dists: np.typing.NDArray[np.int64]) -> np.typing.NDArray[np.int64]:
+        """
+        Return the edit distance between each target and candidate word.
+
+        Distances larger than their max_allowed_dist are returned as max_allowed_dist + 1.
+        """
+
+        edit_dists = max_allowed_dists + 1
+
+        # the edit distance is at least the length difference, so most pairs don't need to be calculated
+        possible = np.abs(np.subtract.outer(target_lens, candidate_lens)) <= max_allowed_dists
+
+        i_targets, i_candidates = np.nonzero(possible)
+        targets = [self._targets[i] for i in i_targets.tolist()]
+        candidates = [self._candidates[i] for i in i_candidates.tolist()]
+
+        if self._word_dists is not None:
+            # word pairs which aren't contained are outside of their max_allowed_dist
+            for i_target, i_candidate, inner_target, inner_candidate in zip(i_targets.tolist(),
+                                                                            i_candidates.tolist(),
+                                                                            targets,
+                                                                            candidates):
+                edit_dist = self._word_dists.get((inner_target, inner_candidate))
+                if edit_dist is not None:
+                    edit_dists[i_target, i_candidate] = edit_dist
+        else:
+            # the same word pairs occur very often, so their distances are cached
+            edit_dists[i_targets, i_candidates] = DistanceCache.get_many(targets,
+                                                                         candidates,
+                                                                         max_allowed_dists[i_targets, i_candidates])
+
+        return edit_dists
+
     def calculate(self) -> float:
         """Calculate the similarity"""
 
-        score = max(
-            self._calculate_simple(),
-            self._calculate_complex()
-        )
+        score = self._calculate_simple()
+
+        # the complex score only needs to be calculated if it could be higher
+        if score < self._complex_upper_bound(score):
+            score = max(score, self._calculate_complex())
+
         score = np.round(score, 2).item()
 
         if score < 0.0 or score > 1.0:
@@ -79,7 +206,10 @@ class Similarity():
         return float(score)
 
     def _calculate_simple(self) -> float:
-        edit_dist = levenshtein_distance(self._target, self._candidate)
+        if self._kernel is not None:
+            return self._kernel.score(self._target, self._candidate, self._threshold)
+
+        edit_dist = levenshtein_distance(self._target, self._candidate, self._threshold)
 
         if edit_dist > self._threshold:
             return 0.0
@@ -90,6 +220,24 @@ class Similarity():
         score = similar_chars / divisor
         return score
 
+    def _complex_upper_bound(self, simple_score: float) -> float:
+        """Return an upper bound for the complex score, without constructing the scores_array"""
+
+        # no score can be higher than a perfect match
+        if simple_score == 1.0:
+            return 1.0
+
+        if self._kernel is not None and not self._kernel.compares_words:
+            return 0.0
+
+        if self._kernel is None and len(self._targets) == 1 and len(self._candidates) == 1:
+            # the only word pair is the whole target and candidate, but with a stricter max_allowed_dist
+            # so it either has the same score or 0.0
+            return simple_score
+
+        # each target word contributes a score of at most 1.0
+        return len(self._targets) / len(self._candidates)
+
     def _calculate_complex(self) -> float:
         score_divisor = len(self._candidates)
 
@@ -101,9 +249,7 @@ class Similarity():
                 total_score += row.max()
             return total_score / score_divisor
 
-        indexes = self._construct_overlapping_indexes()
-
-        optimal_indexes = self._construct_optimal_indexes(indexes)
+        optimal_indexes = self._construct_optimal_indexes()
 
         total_score = 0.0
         for row_i, col_i in enumerate(optimal_indexes):
@@ -121,21 +267,7 @@ class Similarity():
 
         return indexes
 
-    def _construct_overlapping_indexes(self) -> dict[int, list[int]]:
-        indexes: dict[int, list[int]] = {}
-
-        for row_i, row in enumerate(self.scores_array):
-            index = np.argmax(row).item()
-            if row[index] == 0.0:
-                index = -1
-
-            if index not in indexes:
-                indexes[index] = []
-            indexes[index].append(row_i)
-
-        return indexes
-
-    def _construct_optimal_indexes(self, indexes: dict[int, list[int]]) -> list[int]:
+    def _construct_optimal_indexes(self) -> list[int]:
         """
         This class will create a list which maximizes the total score, so that each target is used once.
         For example:
@@ -146,56 +278,7 @@ class Similarity():
         such that the total score equals 0.75 + 1.0 + 0.8 = 2.55.
         """
 
-        while not self._optional_calc_is_done(indexes):
-            curr_index = self._optional_calc_get_next_index(indexes)
-
-            curr_target_indexes = indexes[curr_index]
-            del indexes[curr_index]
-
-            curr_scores: np.typing.NDArray[np.float64] = np.ndarray((len(curr_target_indexes),
-                                                                     self.scores_array.shape[1]),
-                                                                    dtype=np.ndarray)
-
-            scores_i = 0
-            for row_i, row in enumerate(self.scores_array):
-                if row_i in curr_target_indexes:
-                    curr_scores[scores_i] = row
-                    scores_i += 1
-
-            _, ind = _alg_with_index(curr_scores, 0.0)
-
-            for target_i, candidate_i in zip(curr_target_indexes, ind):
-                if candidate_i not in indexes:
-                    indexes[candidate_i] = []
-                indexes[candidate_i].append(target_i)
-
-        number_of_targets = sum((len(item) for item in indexes.values()))
-        optimal_indexes = np.full(number_of_targets, dtype=int, fill_value=-1)
-        for candidate_i, target_is in indexes.items():
-            if candidate_i != -1:
-                optimal_indexes[target_is[0]] = candidate_i
-
-        if -1 in indexes:
-            # fill up remaining slots with target_i which didn't match (candidate_1 == -1)
-            for target_i in indexes[-1]:
-                for i, item in enumerate(optimal_indexes):
-                    if item == -1:
-                        optimal_indexes[i] = target_i
-
-        return optimal_indexes.tolist()
-
-    def _optional_calc_is_done(self, indexes: dict[int, list[int]]) -> bool:
-        for i, l in indexes.items():
-            if i != -1 and len(l) > 1:
-                return False
-        return True
-
-    def _optional_calc_get_next_index(self, indexes: dict[int, list[int]]) -> int:
-        for i in indexes.keys():
-            if i != -1 and len(indexes[i]) > 1:
-                return i
-
-        raise RuntimeError()
+        return _max_score_assignment(self.scores_array.tolist())
 
 def _contains_duplicates(arr: list[np.intp]) -> bool:
     seen = set()
@@ -208,59 +291,70 @@ def _contains_duplicates(arr: list[np.intp]) -> bool:
 
     return False
 
-def _alg_with_index(data: np.ndarray, combined_score: float) -> tuple[float, list[int]]:
+def _max_score_assignment(scores: list[list[float]]) -> list[int]:
     """
-    I have no idea what to call this algorithm.
+    Solve the assignment problem, returning the column index for each row such that the sum of scores is maximal.
 
-    It generates all unique combinations of a 2d input array such that in each combination,
-    each row and each column only occurs once.
+    Each column is used at most once, and there can't be more rows than columns.
 
-    This process is done recursively and is quite costly,
-    as the number of combinations equals !n, where n is (number of rows / number of columns).
+    This is the hungarian algorithm with shortest augmenting paths (Jonker-Volgenant),
+    which runs in O(n^2 * m), where n is the number of rows and m is the number of columns.
     """
 
-    if data.shape[0] == 1:
-        # take the maximum score of all current scores
-        index = int(data.argmax())
-        if data[0][index] > 0.0:
-            return (combined_score + data[0][index], [index])
-        return (combined_score, [-1])
-
-    max_score, max_indexes = _alg_with_index(_reduce(data, 0), combined_score + data[0][0])
-    max_row_index = 0
-    for row_index in range(1, data.shape[0]):
-        reduced_data = _reduce(data, row_index)
-
-        score, indexes = _alg_with_index(reduced_data, combined_score + data[row_index][0])
-
-        # branching with if is much faster than max, because max_score only rarely changes
-        # pylint: disable-next=consider-using-max-builtin
-        if score > max_score:
-            max_score = score
-            max_indexes = indexes
-            max_row_index = row_index
-
-    # shift indexes
-    for i, item in enumerate(max_indexes):
-        if item != -1:
-            max_indexes[i] = item + 1
-
-    # store current index
-    if data[max_row_index][0] != 0.0:
-        max_indexes.insert(max_row_index, 0)
-    else:
-        max_indexes.insert(max_row_index, -1)
-
-    return (max_score, max_indexes)
-
-def _reduce(data: np.ndarray, r_index: int) -> np.ndarray:
-    new_array = np.empty((data.shape[0] - 1, data.shape[1] - 1))
-
-    row_i = 0
-    for orig_row_i in range(data.shape[0]):
-        if orig_row_i != r_index:
-            # we can copy the whole row, excluding the first element
-            new_array[row_i] = data[orig_row_i][1:]
-            row_i += 1
-
-    return new_array
+    rows = len(scores)
+    cols = len(scores[0]) if rows > 0 else 0
+
+    # the algorithm minimizes costs, so the scores are negated
+    # index 0 of the following lists is a virtual row / column
+    row_potential = [0.0] * (rows + 1)
+    col_potential = [0.0] * (cols + 1)
+    # the row assigned to each column, where 0 means unassigned
+    assigned_row = [0] * (cols + 1)
+    # the previous column on the current augmenting path
+    prev_col = [0] * (cols + 1)
+
+    for row in range(1, rows + 1):
+        assigned_row[0] = row
+        curr_col = 0
+        min_slack = [float("inf")] * (cols + 1)
+        visited = [False] * (cols + 1)
+
+        # search for the shortest augmenting path starting in row
+        while assigned_row[curr_col] != 0:
+            visited[curr_col] = True
+            curr_row = assigned_row[curr_col]
+            row_scores = scores[curr_row - 1]
+            delta = float("inf")
+            next_col = 0
+
+            for col in range(1, cols + 1):
+                if not visited[col]:
+                    slack = -row_scores[col - 1] - row_potential[curr_row] - col_potential[col]
+                    if slack < min_slack[col]:
+                        min_slack[col] = slack
+                        prev_col[col] = curr_col
+                    if min_slack[col] < delta:
+                        delta = min_slack[col]
+                        next_col = col
+
+            for col in range(cols + 1):
+                if visited[col]:
+                    row_potential[assigned_row[col]] += delta
+                    col_potential[col] -= delta
+                else:
+                    min_slack[col] -= delta
+
+            curr_col = next_col
+
+        # flip the assignments along the augmenting path
+        while curr_col != 0:
+            col = prev_col[curr_col]
+            assigned_row[curr_col] = assigned_row[col]
+            curr_col = col
+
+    optimal_indexes = [-1] * rows
+    for col in range(1, cols + 1):
+        if assigned_row[col] != 0:
+            optimal_indexes[assigned_row[col] - 1] = col - 1
+
+    return optimal_indexes
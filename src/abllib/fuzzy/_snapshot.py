@@ -0,0 +1,212 @@
+"""Module containing functions to store numpy arrays in a flat binary file, which can be memory-mapped"""
+
+import json
+import os
+from collections.abc import Iterable, Sequence
+from typing import Any, overload
+
+import numpy as np
+
+# the file starts with _MAGIC, followed by the length of the json header and the header itself
+_MAGIC = b"ABLLIBNP"
+_VERSION = 1
+# each array starts at a multiple of this, so that they can be used directly from a memory-mapped file
+_ALIGNMENT = 64
+
+def write_arrays(path: str, arrays: dict[str, np.typing.NDArray], metadata: dict[str, Any]) -> None:
+    """
+    Write the arrays and json-serializable metadata to path.
+
+    The header contains the dtype, shape and offset of each array, followed by the raw data of all arrays.
+    """
+
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    table: dict[str, dict[str, Any]] = {}
+    size = 0
+    for name, array in arrays.items():
+        if array.dtype.hasobject:
+            raise ValueError(f"Array '{name}' can't contain python objects")
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": size}
+        size = _align(size + array.nbytes)
+
+    header = json.dumps({"version": _VERSION, "metadata": metadata, "arrays": table}).encode("utf-8")
+    data_start = _align(len(_MAGIC) + 8 + len(header))
+
+    # other processes could have memory-mapped the old file, so it must not be overwritten in place
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(array.data)
+        f.truncate(data_start + size)
+    os.replace(tmp_path, path)
+
+def read_arrays(path: str, mmap: bool) -> tuple[dict[str, np.typing.NDArray], dict[str, Any]]:
+    """
+    Read the arrays and metadata written by write_arrays.
+
+    If mmap is True, the arrays are memory-mapped copy-on-write, so changes are never written back to the file.
+    """
+
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"'{path}' is not a valid array file")
+        header_len = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    if header["version"] != _VERSION:
+        raise ValueError(f"'{path}' has version {header['version']}, but only version {_VERSION} is supported")
+
+    data_start = _align(len(_MAGIC) + 8 + header_len)
+    buffer = np.memmap(path, dtype=np.uint8, mode="c") if mmap else np.fromfile(path, dtype=np.uint8)
+
+    arrays = {}
+    for name, item in header["arrays"].items():
+        dtype = np.dtype(item["dtype"])
+        if dtype.hasobject:
+            raise ValueError(f"Array '{name}' can't contain python objects")
+        arrays[name] = np.ndarray(tuple(item["shape"]), dtype=dtype, buffer=buffer, offset=data_start + item["offset"])
+
+    return arrays, header["metadata"]
+
+def encode_strings(strings: Sequence[str]) -> tuple[np.typing.NDArray[np.uint32], np.typing.NDArray[np.int64]]:
+    """Return the concatenated codepoints of all strings, and the offset of each string within them"""
+
+    codepoints = np.frombuffer("".join(strings).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(string) for string in strings), dtype=np.int64, count=len(strings)), out=offsets[1:])
+    return codepoints, offsets
+
+class StringTable(Sequence[str]):
+    """
+    A list of strings, which are stored as codepoints and only decoded when they are accessed.
+
+    String i consists of codepoints[starts[i]:ends[i]].
+    If the arrays are memory-mapped, loading the table doesn't create any python objects per string.
+    New strings can be appended, they are kept in a normal list.
+    """
+
+    __slots__ = ("_codepoints", "_starts", "_ends", "_added")
+
+    def __init__(self,
+                 codepoints: np.typing.NDArray[np.uint32],
+                 starts: np.typing.NDArray[np.int64],
+                 ends: np.typing.NDArray[np.int64]) -> None:
+        # memoryviews are much faster to index and slice than numpy arrays
+        self._codepoints = codepoints.data.cast("B")
+        self._starts = starts.data
+        self._ends = ends.data
+        self._added: list[str] = []
+
+    @overload
+    def __getitem__(self, key: int) -> str: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> list[str]: ...
+
+    def __getitem__(self, key: int | slice) -> str | list[str]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1 and start < stop <= len(self._starts):
+                return self._decode_range(start, stop)
+            return [self[i] for i in range(start, stop, step)]
+
+        stored = len(self._starts)
+        if key < 0:
+            key += len(self)
+        if key >= stored:
+            return self._added[key - stored]
+        if key < 0:
+            raise IndexError("StringTable index out of range")
+
+        return str(self._codepoints[self._starts[key] * 4:self._ends[key] * 4], "utf-32-le", "surrogatepass")
+
+    def __len__(self) -> int:
+        return len(self._starts) + len(self._added)
+
+    def _decode_range(self, start: int, stop: int) -> list[str]:
+        """Return the stored strings start to stop, decoding the codepoints only once"""
+
+        starts = self._starts[start:stop].tolist()
+        ends = self._ends[start:stop].tolist()
+        # strings next to each other, like the words of an entry, are usually stored next to each other
+        base = min(starts)
+        text = str(self._codepoints[base * 4:max(ends) * 4], "utf-32-le", "surrogatepass")
+        return [text[string_start - base:string_end - base] for string_start, string_end in zip(starts, ends)]
+
+    def append(self, string: str) -> None:
+        """Append a string to the end of the table"""
+
+        self._added.append(string)
+
+    def extend(self, strings: Iterable[str]) -> None:
+        """Append all strings to the end of the table"""
+
+        self._added.extend(strings)
+
+class CandidateTable(Sequence[str | tuple[str, ...]]):
+    """
+    The candidates of a loaded FuzzyIndex, which are only created when they are accessed.
+
+    Candidate i consists of items[item_offsets[i]:item_offsets[i + 1]], which is a tuple if is_tuple[i] is True.
+    Candidates can be appended and replaced, those are kept in normal python containers.
+    """
+
+    __slots__ = ("_items", "_item_offsets", "_is_tuple", "_added", "_replaced")
+
+    def __init__(self,
+                 items: StringTable,
+                 item_offsets: np.typing.NDArray[np.int64],
+                 is_tuple: np.typing.NDArray[np.bool_]) -> None:
+        self._items = items
+        self._item_offsets = item_offsets
+        self._is_tuple = is_tuple
+        self._added: list[str | tuple[str, ...]] = []
+        self._replaced: dict[int, str | tuple[str, ...]] = {}
+
+    @overload
+    def __getitem__(self, key: int) -> str | tuple[str, ...]: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> list[str | tuple[str, ...]]: ...
+
+    def __getitem__(self, key: int | slice) -> str | tuple[str, ...] | list[str | tuple[str, ...]]:
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+
+        stored = len(self._is_tuple)
+        if key < 0:
+            key += len(self)
+        if key >= stored:
+            return self._added[key - stored]
+        if key < 0:
+            raise IndexError("CandidateTable index out of range")
+        if key in self._replaced:
+            return self._replaced[key]
+
+        start = int(self._item_offsets[key])
+        if self._is_tuple[key]:
+            return tuple(self._items[start:int(self._item_offsets[key + 1])])
+        return self._items[start]
+
+    def __setitem__(self, key: int, candidate: str | tuple[str, ...]) -> None:
+        stored = len(self._is_tuple)
+        if key >= stored:
+            self._added[key - stored] = candidate
+        else:
+            self._replaced[key] = candidate
+
+    def __len__(self) -> int:
+        return len(self._is_tuple) + len(self._added)
+
+    def append(self, candidate: str | tuple[str, ...]) -> None:
+        """Append a candidate to the end of the table"""
+
+        self._added.append(candidate)
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
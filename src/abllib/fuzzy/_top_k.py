@@ -0,0 +1,31 @@
+"""A module containing the fuzzy top-k search function"""
+
+from abllib.error import WrongTypeError
+from abllib.fuzzy._index import FuzzyIndex
+from abllib.fuzzy._matchresult import MatchResult
+
+def match_top_k(target: str,
+                candidates: list[str | tuple[str, ...]],
+                k: int,
+                threshold: int = 5) -> list[MatchResult]:
+    """
+    Search for the k candidates most similar to the target. Applies fuzzy logic when comparing.
+
+    Candidates are matched with the same conditions as in match_all.
+
+    Candidates whose upper bound score can't beat the current k-th best result are skipped without being scored.
+
+    Returns a list of at most k MatchResults, sorted by descending score.
+    If two candidates have the same score, the one with the lower index comes first.
+    """
+
+    if not isinstance(candidates, list):
+        raise WrongTypeError.with_values(candidates, list)
+    if threshold < 0:
+        raise ValueError("Threshold needs to be >= 0")
+    if not isinstance(k, int):
+        raise WrongTypeError.with_values(k, int)
+    if k < 0:
+        raise ValueError("k needs to be >= 0")
+
+    return FuzzyIndex(candidates).match_top_k(target, k, threshold)
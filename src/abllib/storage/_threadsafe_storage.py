@@ -2,58 +2,92 @@
 
 """Module containing the _PersistentStorage class"""
 
-from typing import Any
+import functools
+from typing import Any, Callable
 
 from abllib import error, wrapper
 from abllib._storage._base_storage import _BaseStorage
 
+# pylint: disable=protected-access
+
+def _read_locked(func: Callable) -> Callable:
+    """Make a storage method hold the read lock of its storage during execution"""
+
+    @functools.wraps(func)
+    def wrapper_func(self, *args: Any, **kwargs: Any) -> Any:
+        lock = self._lock
+        lock.acquire_read()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+
+    return wrapper_func
+
+def _write_locked(func: Callable) -> Callable:
+    """Make a storage method hold the write lock of its storage during execution"""
+
+    @functools.wraps(func)
+    def wrapper_func(self, *args: Any, **kwargs: Any) -> Any:
+        lock = self._lock
+        lock.acquire_write()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+
+    return wrapper_func
+
 class _ThreadsafeStorage(_BaseStorage):
     def __init__(self) -> None:
         raise NotImplementedError()
 
     _STORAGE_NAME = "ThreadsafeStorage"
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    # each subclass gets its own lock in __init_subclass__
+    _lock = wrapper.ReadWriteLock()
+
+    @_read_locked
     def contains_item(self, key, item):
         return super().contains_item(key, item)
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    @_read_locked
     def contains(self, key):
         return super().contains(key)
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    @_read_locked
     def get(self, key, default = None):
         return super().get(key, default)
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    @_read_locked
     def items(self):
         return super().items()
 
-    @wrapper.NamedLock(_STORAGE_NAME)
+    @_write_locked
     def pop(self, key) -> Any:
         return super().pop(key)
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    @_read_locked
     def keys(self):
         return super().keys()
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    @_read_locked
     def values(self):
         return super().values()
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    @_read_locked
     def __getitem__(self, key):
         return super().__getitem__(key)
 
-    @wrapper.NamedLock(_STORAGE_NAME)
+    @_write_locked
     def __setitem__(self, key: str, item: Any) -> None:
         return super().__setitem__(key, item)
 
-    @wrapper.NamedLock(_STORAGE_NAME)
+    @_write_locked
     def __delitem__(self, key):
         return super().__delitem__(key)
 
-    @wrapper.NamedSemaphore(_STORAGE_NAME)
+    @_read_locked
     def __contains__(self, key):
         return super().__contains__(key)
 
@@ -63,3 +97,5 @@ class _ThreadsafeStorage(_BaseStorage):
 
         if not isinstance(cls._STORAGE_NAME, str):
             raise error.WrongTypeError.with_values(cls._STORAGE_NAME, str)
+
+        cls._lock = wrapper.ReadWriteLock()
@@ -1,7 +1,7 @@
 """A module containing various wrappers"""
 
 from abllib.wrapper._deprecated import deprecated
-from abllib.wrapper._lock import Lock, Semaphore
+from abllib.wrapper._lock import Lock, ReadWriteLock, Semaphore
 from abllib.wrapper._lock_wrapper import (NamedLock, NamedSemaphore, ReadLock,
                                           WriteLock)
 from abllib.wrapper._log_error import log_error
@@ -14,6 +14,7 @@ __exports__ = [
     NamedLock,
     NamedSemaphore,
     ReadLock,
+    ReadWriteLock,
     Semaphore,
     WriteLock,
     deprecated,
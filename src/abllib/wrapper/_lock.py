@@ -1,8 +1,9 @@
-"""A module containing a custom Lock and Semaphore class"""
+"""A module containing a custom Lock, Semaphore and ReadWriteLock class"""
 
 import threading
 from time import sleep
 from types import TracebackType
+from typing import Callable
 
 from abllib import error
 
@@ -120,3 +121,134 @@ class Semaphore(threading.BoundedSemaphore):
         """Return whether this semaphore is blocked"""
 
         return self._blocked
+
+class ReadWriteLock():
+    """
+    A lock which can be held by multiple readers at once, or by a single writer.
+
+    Writers are preferred: while a writer waits, new readers wait too, so constant reads can't starve writers.
+    Waiting threads sleep on a condition variable until the lock is released, nothing is polled.
+
+    Both acquisitions are reentrant, and the thread holding the write lock can also acquire the read lock.
+    Upgrading a held read lock to the write lock isn't possible, because it would wait forever.
+    """
+
+    def __init__(self) -> None:
+        # the mutex guarding the state, which is also used directly to skip the slower Condition methods
+        self._mutex = threading.Lock()
+        self._condition = threading.Condition(self._mutex)
+        # the number of times each reading thread holds the read lock
+        self._readers: dict[int, int] = {}
+        self._writer: int | None = None
+        self._writer_count = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self, blocking: bool = True, timeout: float | None = None) -> bool:
+        """
+        Try to acquire the read lock.
+
+        If blocking is disabled, it doesn't wait for the timeout.
+
+        If timeout is set, wait for n seconds before returning.
+        """
+
+        ident = threading.get_ident()
+        with self._mutex:
+            # nested acquisitions can't wait for waiting writers, as those wait for this thread
+            if ident in self._readers or self._writer == ident:
+                self._readers[ident] = self._readers.get(ident, 0) + 1
+                return True
+
+            if (self._writer is not None or self._waiting_writers > 0) \
+               and not self._wait(self._can_read, blocking, timeout):
+                return False
+
+            self._readers[ident] = 1
+            return True
+
+    def release_read(self) -> None:
+        """Release the read lock if it is currently held by this thread"""
+
+        ident = threading.get_ident()
+        with self._mutex:
+            count = self._readers.get(ident)
+            if count is None:
+                return
+
+            if count > 1:
+                self._readers[ident] = count - 1
+                return
+
+            del self._readers[ident]
+            if len(self._readers) == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self, blocking: bool = True, timeout: float | None = None) -> bool:
+        """
+        Try to acquire the write lock.
+
+        If blocking is disabled, it doesn't wait for the timeout.
+
+        If timeout is set, wait for n seconds before returning.
+
+        Raises a LockAcquisitionTimeoutError if this thread holds the read lock.
+        """
+
+        ident = threading.get_ident()
+        with self._mutex:
+            if self._writer == ident:
+                self._writer_count += 1
+                return True
+
+            if ident in self._readers:
+                raise error.LockAcquisitionTimeoutError("The write lock can't be acquired "
+                                                        + "while the same thread holds the read lock")
+
+            if self._writer is not None or len(self._readers) > 0:
+                self._waiting_writers += 1
+                try:
+                    acquired = self._wait(self._can_write, blocking, timeout)
+                finally:
+                    self._waiting_writers -= 1
+
+                if not acquired:
+                    # readers waiting for this writer can continue
+                    self._condition.notify_all()
+                    return False
+
+            self._writer = ident
+            self._writer_count = 1
+            return True
+
+    def release_write(self) -> None:
+        """Release the write lock if it is currently held by this thread"""
+
+        with self._mutex:
+            if self._writer != threading.get_ident():
+                return
+
+            self._writer_count -= 1
+            if self._writer_count == 0:
+                self._writer = None
+                self._condition.notify_all()
+
+    def locked(self) -> bool:
+        """Returns whether the read lock or write lock is held"""
+
+        return self._writer is not None or len(self._readers) > 0
+
+    def write_locked(self) -> bool:
+        """Returns whether the write lock is held"""
+
+        return self._writer is not None
+
+    def _can_read(self) -> bool:
+        return self._writer is None and self._waiting_writers == 0
+
+    def _can_write(self) -> bool:
+        return self._writer is None and len(self._readers) == 0
+
+    def _wait(self, predicate: Callable[[], bool], blocking: bool, timeout: float | None) -> bool:
+        if not blocking:
+            return predicate()
+        return self._condition.wait_for(predicate, timeout)
@@ -0,0 +1,233 @@
+"""
+Benchmarks for the levenshtein distance and fuzzy matching hot paths.
+
+All corpora are generated from a seed, so results of different runs can be compared.
+The results are printed as json, or written to a file with --output.
+
+Usage:
+python src/bench/fuzzy_bench.py --sizes 1000 10000 --output results.json
+"""
+
+# pylint: disable=wrong-import-position, protected-access
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable
+
+# Adding source path to sys path
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import numpy as np
+
+from abllib import alg, fuzzy
+from abllib.alg import _bitparallel, _levenshtein, _native
+from abllib.fuzzy._distance_cache import DistanceCache
+
+SYLLABLES = ["ka", "to", "ri", "ne", "mu", "sa", "lo", "pe", "di", "gu", "an", "el", "or", "is", "ch", "st"]
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+def make_words(rand: random.Random, count: int) -> list[str]:
+    """Return count random words with 1 to 5 syllables"""
+
+    return ["".join(rand.choice(SYLLABLES) for _ in range(rand.randint(1, 5))) for _ in range(count)]
+
+def make_corpus(size: int, seed: int) -> list[str | tuple[str, ...]]:
+    """
+    Return size candidates with 1 to 8 words each, drawn from a vocabulary which grows with size.
+
+    Every tenth candidate is a tuple of two alternative titles.
+    """
+
+    rand = random.Random(seed)
+    vocab = make_words(rand, max(100, size // 5))
+
+    candidates: list[str | tuple[str, ...]] = []
+    for i in range(size):
+        title = " ".join(rand.choice(vocab) for _ in range(rand.randint(1, 8)))
+        if i % 10 == 0:
+            candidates.append((title, " ".join(rand.choice(vocab) for _ in range(rand.randint(1, 4)))))
+        else:
+            candidates.append(title)
+    return candidates
+
+def make_targets(candidates: list[str | tuple[str, ...]], count: int, seed: int) -> list[str]:
+    """Return count targets, which are a mix of exact candidates, candidates with typos and unrelated words"""
+
+    rand = random.Random(seed + 1)
+
+    targets = []
+    for i in range(count):
+        candidate = rand.choice(candidates)
+        title = candidate if isinstance(candidate, str) else candidate[0]
+        match i % 3:
+            case 0:
+                targets.append(title)
+            case 1:
+                chars = list(title)
+                for _ in range(max(1, len(chars) // 8)):
+                    chars[rand.randrange(len(chars))] = rand.choice("abcdefghijklmnopqrstuvwxyz")
+                targets.append("".join(chars))
+            case _:
+                targets.append(" ".join(make_words(rand, rand.randint(1, 3))))
+    return targets
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """Run func repeat times, and return the fastest and median run time in seconds"""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "runs": repeat
+    }
+
+def call_each(func: Callable[..., Any], args_list: list[tuple[Any, ...]]) -> None:
+    """Call func once with each of the given arguments"""
+
+    for args in args_list:
+        func(*args)
+
+def similarity_uncached(pairs: list[tuple[str, str]]) -> None:
+    """Calculate the similarity of each pair, starting with an empty DistanceCache"""
+
+    # without clearing, every run after the first would only measure cache lookups
+    DistanceCache.clear()
+    for target, candidate in pairs:
+        fuzzy.similarity(target, candidate)
+
+def bench_levenshtein(seed: int, repeat: int) -> list[dict[str, Any]]:
+    """Benchmark levenshtein_distance and levenshtein_many of each available backend"""
+
+    rand = random.Random(seed)
+    short_pairs = list(zip(make_words(rand, 2000), make_words(rand, 2000)))
+    long_pairs = [(" ".join(make_words(rand, 40)), " ".join(make_words(rand, 40))) for _ in range(50)]
+    query = "kanemusalo"
+    many = make_words(rand, 10000)
+
+    backends = {
+        "numpy": _levenshtein,
+        "bitparallel": _bitparallel,
+        "native": _native if _native.Levenshtein is not None else None
+    }
+
+    results = []
+    for backend, module in backends.items():
+        if module is None:
+            results.append({"name": "levenshtein_distance", "backend": backend, "skipped": "Levenshtein not installed"})
+            continue
+
+        cases: dict[str, Callable[[], Any]] = {
+            "short": partial(call_each, module.levenshtein_distance, short_pairs),
+            "short_bounded": partial(call_each, module.levenshtein_distance, [(a, b, 2) for a, b in short_pairs]),
+            "long": partial(call_each, module.levenshtein_distance, long_pairs)
+        }
+        if hasattr(module, "levenshtein_many"):
+            cases["many_bounded"] = partial(module.levenshtein_many, query, many, 3)
+
+        for case, func in cases.items():
+            results.append({"name": "levenshtein_distance", "backend": backend, "case": case, **measure(func, repeat)})
+
+    return results
+
+def bench_similarity(seed: int, repeat: int) -> list[dict[str, Any]]:
+    """Benchmark fuzzy.similarity for short, long and worst case inputs"""
+
+    rand = random.Random(seed)
+    words = make_words(rand, 500)
+    short_pairs = [(" ".join(rand.sample(words, 2)), " ".join(rand.sample(words, 3))) for _ in range(1000)]
+    long_pairs = [(" ".join(rand.sample(words, 15)), " ".join(rand.sample(words, 20))) for _ in range(50)]
+
+    # all words are similar to each other, so the best word of each row collides
+    # and the optimal assignment (formerly _alg_with_index) needs to be solved
+    similar = ["".join(rand.choice("ab") for _ in range(6)) for _ in range(40)]
+    assignment_pairs = [(" ".join(rand.sample(similar, 12)), " ".join(rand.sample(similar, 16))) for _ in range(20)]
+
+    cases = {
+        "short": short_pairs,
+        "long": long_pairs,
+        "assignment_worst_case": assignment_pairs
+    }
+
+    results = []
+    for case, pairs in cases.items():
+        results.append({"name": "similarity",
+                        "case": case,
+                        "pairs": len(pairs),
+                        **measure(partial(similarity_uncached, pairs), repeat)})
+
+    return results
+
+def bench_matching(sizes: list[int], seed: int, repeat: int, targets_count: int) -> list[dict[str, Any]]:
+    """Benchmark match_all and match_closest on corpora of the given sizes"""
+
+    results = []
+    for size in sizes:
+        candidates = make_corpus(size, seed)
+        targets = make_targets(candidates, targets_count, seed)
+
+        results.append({"name": "FuzzyIndex", "case": "build", "size": size,
+                        **measure(partial(fuzzy.FuzzyIndex, candidates), repeat)})
+
+        index = fuzzy.FuzzyIndex(candidates)
+        funcs: dict[str, Callable[[], Any]] = {
+            "match_all": partial(call_each, fuzzy.match_all, [(target, candidates) for target in targets]),
+            "match_closest": partial(call_each, fuzzy.match_closest, [(target, candidates) for target in targets]),
+            "FuzzyIndex.match_all": partial(call_each, index.match_all, [(target,) for target in targets]),
+            "FuzzyIndex.match_closest": partial(call_each, index.match_closest, [(target,) for target in targets])
+        }
+        for name, func in funcs.items():
+            results.append({"name": name, "size": size, "targets": len(targets), **measure(func, repeat)})
+
+    return results
+
+def main() -> None:
+    """Run all benchmarks and emit the results as json"""
+
+    parser = argparse.ArgumentParser(description="Benchmark the levenshtein distance and fuzzy matching")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="the corpus sizes")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the generated corpora")
+    parser.add_argument("--repeat", type=int, default=3, help="how often each benchmark is run")
+    parser.add_argument("--targets", type=int, default=10, help="the number of targets matched per corpus")
+    parser.add_argument("--output", help="write the results to this file instead of printing them")
+    args = parser.parse_args()
+
+    results = []
+    results.extend(bench_levenshtein(args.seed, args.repeat))
+    results.extend(bench_similarity(args.seed, args.repeat))
+    results.extend(bench_matching(args.sizes, args.seed, args.repeat, args.targets))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "levenshtein_backend": alg.levenshtein_distance.__module__,
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, "w", encoding="utf8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 """Module containing tests for the abllib.alg module"""
 
+import random
+
+import numpy as np
 import pytest
 
 from abllib import alg, error
+from abllib.alg import _banded, _bitparallel, _levenshtein
+
+# pylint: disable=protected-access
 
 def test_levenshtein_distance():
     """Ensure that alg.levenshtein_distance works as expected"""
@@ -20,3 +26,333 @@ def test_levenshtein_distance():
         alg.levenshtein_distance(None, "test")
     with pytest.raises((error.WrongTypeError, TypeError)):
         alg.levenshtein_distance("test", 12)
+
+def test_levenshtein_distance_numpy():
+    """Ensure that the numpy fallback implementation matches the reference implementation"""
+
+    numpy_distance = _levenshtein.levenshtein_distance
+
+    assert numpy_distance("fox", "fox") == 0
+    assert numpy_distance("fox", "fof") == 1
+    assert numpy_distance("the brown fox", "the green fox") == 3
+    assert numpy_distance("", "a") == 1
+    assert numpy_distance("a", "") == 1
+    assert numpy_distance("", "") == 0
+    assert numpy_distance("kitten", "sitting") == 3
+    assert numpy_distance("sitting", "kitten") == 3
+
+    assert isinstance(numpy_distance("dog", "god"), int)
+
+    rng = random.Random(1234)
+    for _ in range(500):
+        token1 = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 12)))
+        token2 = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 12)))
+        assert numpy_distance(token1, token2) == _reference_distance(token1, token2)
+
+    with pytest.raises(error.WrongTypeError):
+        numpy_distance("test", None)
+    with pytest.raises(error.WrongTypeError):
+        numpy_distance(None, "test")
+
+def test_levenshtein_distance_bitparallel():
+    """Ensure that the bit-parallel implementation matches the reference implementation"""
+
+    bitparallel_distance = _bitparallel.levenshtein_distance
+
+    assert bitparallel_distance("fox", "fox") == 0
+    assert bitparallel_distance("fox", "fof") == 1
+    assert bitparallel_distance("the brown fox", "the green fox") == 3
+    assert bitparallel_distance("", "a") == 1
+    assert bitparallel_distance("a", "") == 1
+    assert bitparallel_distance("", "") == 0
+    assert bitparallel_distance("kitten", "sitting") == 3
+    assert bitparallel_distance("sitting", "kitten") == 3
+
+    assert isinstance(bitparallel_distance("dog", "god"), int)
+
+    rng = random.Random(1234)
+    for _ in range(500):
+        # patterns longer than 64 characters span multiple machine words
+        token1 = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 80)))
+        token2 = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 80)))
+        assert bitparallel_distance(token1, token2) == _reference_distance(token1, token2)
+
+    with pytest.raises(error.WrongTypeError):
+        bitparallel_distance("test", None)
+    with pytest.raises(error.WrongTypeError):
+        bitparallel_distance(None, "test")
+
+def test_levenshtein_distance_max_dist():
+    """Ensure that alg.levenshtein_distance stops early if max_dist is exceeded"""
+
+    assert alg.levenshtein_distance("fox", "fox", 0) == 0
+    assert alg.levenshtein_distance("fox", "fof", 1) == 1
+    assert alg.levenshtein_distance("fox", "fof", 0) == 1
+    assert alg.levenshtein_distance("the brown fox", "the green fox", 3) == 3
+    assert alg.levenshtein_distance("the brown fox", "the green fox", 2) == 3
+    assert alg.levenshtein_distance("the brown fox", "the green fox", 1) == 2
+    assert alg.levenshtein_distance("a", "a very long sentence", 2) == 3
+    assert alg.levenshtein_distance("", "ab", 5) == 2
+
+    with pytest.raises(ValueError):
+        alg.levenshtein_distance("test", "test", -1)
+
+def test_levenshtein_distance_max_dist_engines():
+    """Ensure that all python implementations return max_dist + 1 if max_dist is exceeded"""
+
+    rng = random.Random(1234)
+    for _ in range(500):
+        token1 = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 40)))
+        token2 = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 40)))
+        max_dist = rng.randint(0, 12)
+        expected = min(_reference_distance(token1, token2), max_dist + 1)
+
+        assert _bitparallel.levenshtein_distance(token1, token2, max_dist) == expected
+        assert _levenshtein.levenshtein_distance(token1, token2, max_dist) == expected
+
+        if len(token1) < len(token2):
+            token1, token2 = token2, token1
+        assert _banded.banded_distance(token1, token2, max_dist) == expected
+
+    # the distance exceeds max_dist, even though the minimum of each row doesn't
+    token1 = "caacbaadbccbaaadccdcaacd"
+    token2 = "cccaaacdadadcaaacdadbcac"
+    assert _levenshtein.levenshtein_distance(token1, token2) == 14
+    assert _levenshtein.levenshtein_distance(token1, token2, 12) == 13
+    assert _bitparallel.levenshtein_distance(token1, token2, 12) == 13
+    assert _banded.banded_distance(token1, token2, 12) == 13
+    assert alg.levenshtein_distance(token1, token2, 12) == 13
+
+    with pytest.raises(error.WrongTypeError):
+        _bitparallel.levenshtein_distance("test", "test", "2")
+    with pytest.raises(ValueError):
+        _bitparallel.levenshtein_distance("test", "test", -1)
+
+def test_levenshtein_many():
+    """Ensure that alg.levenshtein_many calculates the distance to each candidate"""
+
+    distances = alg.levenshtein_many("fox", ["fox", "fof", "", "the quick fox"])
+    assert isinstance(distances, np.ndarray)
+    assert distances.tolist() == [0, 1, 3, 10]
+
+    distances = alg.levenshtein_many("fox", ["fox", "fof", "", "the quick fox"], 2)
+    assert distances.tolist() == [0, 1, 3, 3]
+
+    assert alg.levenshtein_many("", ["", "ab"]).tolist() == [0, 2]
+    assert len(alg.levenshtein_many("fox", [])) == 0
+
+    rng = random.Random(1234)
+    query = "".join(rng.choice("abc ") for _ in range(20))
+    candidates = ["".join(rng.choice("abc ") for _ in range(rng.randint(0, 40))) for _ in range(200)]
+    expected = [_reference_distance(query, candidate) for candidate in candidates]
+    assert alg.levenshtein_many(query, candidates).tolist() == expected
+    assert _bitparallel.levenshtein_many(query, candidates).tolist() == expected
+    assert _bitparallel.levenshtein_many(query, candidates, 5).tolist() == [min(dist, 6) for dist in expected]
+
+    with pytest.raises((error.WrongTypeError, TypeError)):
+        alg.levenshtein_many("test", ["test", None])
+    with pytest.raises(ValueError):
+        alg.levenshtein_many("test", ["test"], -1)
+
+def test_cdist():
+    """Ensure that alg.cdist calculates the distance between each query and each choice"""
+
+    distances = alg.cdist(["fox", "dog"], ["fox", "fog", "the quick fox"])
+    assert isinstance(distances, np.ndarray)
+    assert distances.shape == (2, 3)
+    assert distances.tolist() == [[0, 1, 10], [2, 1, 12]]
+
+    distances = alg.cdist(["fox", "dog"], ["fox", "fog", "the quick fox"], 1)
+    assert distances.tolist() == [[0, 1, 2], [2, 1, 2]]
+
+    assert alg.cdist([], ["fox"]).shape == (0, 1)
+    assert alg.cdist(["fox"], []).shape == (1, 0)
+
+    with pytest.raises(ValueError):
+        alg.cdist(["fox"], ["fox"], workers=0)
+
+def test_cdist_workers():
+    """Ensure that alg.cdist returns the same results if calculated in multiple processes"""
+
+    rng = random.Random(1234)
+    queries = ["".join(rng.choice("abc ") for _ in range(rng.randint(0, 20))) for _ in range(25)]
+    choices = ["".join(rng.choice("abc ") for _ in range(rng.randint(0, 20))) for _ in range(30)]
+
+    expected = alg.cdist(queries, choices)
+    for query, row in zip(queries, expected):
+        assert row.tolist() == [_reference_distance(query, choice) for choice in choices]
+
+    assert alg.cdist(queries, choices, workers=3).tolist() == expected.tolist()
+    assert alg.cdist(queries, choices, workers=-1).tolist() == expected.tolist()
+    assert alg.cdist(queries, [], workers=2).shape == (25, 0)
+
+    with pytest.raises((error.WrongTypeError, TypeError)):
+        alg.cdist(queries, choices + [None], workers=2)
+
+def test_bktree():
+    """Ensure that alg.BKTree finds the same words as a linear search"""
+
+    rng = random.Random(4321)
+    words = list({"".join(rng.choice("abcd") for _ in range(rng.randint(0, 8))) for _ in range(300)})
+    tree = alg.BKTree(words)
+    assert len(tree) == len(words)
+
+    for query in ["", "abc", "dddd", "abcdabcd", "x"]:
+        for max_dist in range(4):
+            expected = {word: _reference_distance(query, word) for word in words}
+            expected = {word: dist for word, dist in expected.items() if dist <= max_dist}
+
+            results = tree.search(query, max_dist)
+            assert dict(results) == expected
+            assert [dist for _, dist in results] == sorted(expected.values())
+
+    with pytest.raises(ValueError):
+        tree.search("abc", -1)
+    with pytest.raises(error.WrongTypeError):
+        tree.search("abc", "2")
+    with pytest.raises(error.WrongTypeError):
+        tree.insert(None)
+
+def test_bktree_insert_remove():
+    """Ensure that words can be inserted into and removed from an alg.BKTree"""
+
+    tree = alg.BKTree(["book", "books", "cake"])
+    tree.insert("boo")
+    tree.insert("book")
+    assert len(tree) == 4
+    assert "boo" in tree
+    assert dict(tree.search("book", 1)) == {"book": 0, "books": 1, "boo": 1}
+
+    tree.remove("book")
+    assert len(tree) == 3
+    assert "book" not in tree
+    assert dict(tree.search("book", 1)) == {"books": 1, "boo": 1}
+
+    with pytest.raises(error.KeyNotFoundError):
+        tree.remove("book")
+    with pytest.raises(error.KeyNotFoundError):
+        tree.remove("cook")
+
+    tree.insert("book")
+    assert len(tree) == 4
+    assert dict(tree.search("book", 0)) == {"book": 0}
+
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert alg.BKTree().search("book", 2) == []
+
+def test_bktree_rebuild():
+    """Ensure that an alg.BKTree deletes the removed words once they outnumber the contained words"""
+
+    rng = random.Random(42)
+    words = list({"".join(rng.choice("abcd") for _ in range(rng.randint(1, 8))) for _ in range(200)})
+    tree = alg.BKTree(words)
+
+    for word in words[:150]:
+        tree.remove(word)
+        assert tree._removed <= len(tree)
+    assert len(tree) == len(words) - 150
+    assert _count_nodes(tree) <= 2 * len(tree) + 1
+
+    for query in ["", "abc", "dddd"]:
+        expected = {word: _reference_distance(query, word) for word in words[150:]}
+        assert dict(tree.search(query, 2)) == {word: dist for word, dist in expected.items() if dist <= 2}
+
+    tree.insert(words[0])
+    assert words[0] in tree
+    assert len(tree) == len(words) - 149
+
+def test_osa_distance():
+    """Ensure that alg.osa_distance counts swapped adjacent characters as a single edit"""
+
+    assert alg.osa_distance("fox", "fox") == 0
+    assert alg.osa_distance("teh", "the") == 1
+    assert alg.osa_distance("abcd", "acbd") == 1
+    assert alg.osa_distance("ca", "abc") == 3
+    assert alg.osa_distance("", "abc") == 3
+    assert alg.osa_distance("the brown fox", "teh bronw fxo") == 3
+    assert alg.osa_distance("the brown fox", "teh bronw fxo", 1) == 2
+
+    # no substring is edited twice, so this isn't 2 (swap to 'ac', insert 'b')
+    assert alg.osa_distance("ca", "abc") == _reference_osa_distance("ca", "abc")
+
+    rand = random.Random(3)
+    for _ in range(1000):
+        token1 = "".join(rand.choice("abc") for _ in range(rand.randint(0, 12)))
+        token2 = "".join(rand.choice("abc") for _ in range(rand.randint(0, 12)))
+        # adjacent transpositions of a random pair
+        if len(token1) >= 2 and rand.random() < 0.5:
+            pos = rand.randrange(len(token1) - 1)
+            token2 = token1[:pos] + token1[pos + 1] + token1[pos] + token1[pos + 2:]
+        expected = _reference_osa_distance(token1, token2)
+        assert alg.osa_distance(token1, token2) == expected
+        assert alg.osa_distance(token2, token1) == expected
+        assert alg.osa_distance(token1, token2, 2) == min(expected, 3)
+
+    # longer tokens, with more than 64 characters in the pattern
+    for _ in range(20):
+        token1 = "".join(rand.choice("abcd") for _ in range(rand.randint(60, 80)))
+        token2 = "".join(rand.choice("abcd") for _ in range(rand.randint(60, 80)))
+        assert alg.osa_distance(token1, token2) == _reference_osa_distance(token1, token2)
+
+    with pytest.raises(ValueError):
+        alg.osa_distance("test", "test", -1)
+    with pytest.raises(error.WrongTypeError):
+        alg.osa_distance(None, "test")
+
+def test_jaro_winkler_similarity():
+    """Ensure that alg.jaro_winkler_similarity returns the expected scores"""
+
+    assert alg.jaro_winkler_similarity("fox", "fox") == 1.0
+    assert alg.jaro_winkler_similarity("fox", "cat") == 0.0
+    assert alg.jaro_winkler_similarity("", "") == 1.0
+    assert alg.jaro_winkler_similarity("", "fox") == 0.0
+    assert round(alg.jaro_winkler_similarity("MARTHA", "MARHTA"), 3) == 0.961
+    assert round(alg.jaro_winkler_similarity("DWAYNE", "DUANE"), 3) == 0.84
+    assert round(alg.jaro_winkler_similarity("DIXON", "DICKSONX"), 3) == 0.813
+    assert round(alg.jaro_winkler_similarity("DIXON", "DICKSONX", 0.0), 3) == 0.767
+
+    with pytest.raises(ValueError):
+        alg.jaro_winkler_similarity("fox", "fox", 0.5)
+    with pytest.raises(error.WrongTypeError):
+        alg.jaro_winkler_similarity("fox", None)
+
+def _count_nodes(tree: alg.BKTree) -> int:
+    """Return the number of nodes in tree, including removed ones"""
+
+    stack = [] if tree._root is None else [tree._root]
+    count = 0
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children.values())
+    return count
+
+def _reference_distance(token1: str, token2: str) -> int:
+    """The textbook wagner-fischer algorithm, used to verify the optimized implementations"""
+
+    prev_row = list(range(len(token2) + 1))
+    for t1, char1 in enumerate(token1, start=1):
+        curr_row = [t1]
+        for t2, char2 in enumerate(token2, start=1):
+            curr_row.append(min(prev_row[t2] + 1,
+                                curr_row[t2 - 1] + 1,
+                                prev_row[t2 - 1] + (char1 != char2)))
+        prev_row = curr_row
+    return prev_row[-1]
+
+def _reference_osa_distance(token1: str, token2: str) -> int:
+    """The textbook optimal string alignment algorithm, used to verify the bit-parallel implementation"""
+
+    rows = [list(range(len(token2) + 1))]
+    for t1 in range(1, len(token1) + 1):
+        row = [t1]
+        for t2 in range(1, len(token2) + 1):
+            cost = token1[t1 - 1] != token2[t2 - 1]
+            dist = min(rows[t1 - 1][t2] + 1,
+                       row[t2 - 1] + 1,
+                       rows[t1 - 1][t2 - 1] + cost)
+            if t1 > 1 and t2 > 1 and token1[t1 - 1] == token2[t2 - 2] and token1[t1 - 2] == token2[t2 - 1]:
+                dist = min(dist, rows[t1 - 2][t2 - 2] + 1)
+            row.append(dist)
+        rows.append(row)
+    return rows[-1][-1]
@@ -0,0 +1,414 @@
+"""Module containing tests for the abllib.fuzzy.FuzzyIndex class"""
+
+import os
+import random
+import warnings
+
+import pytest
+
+from abllib import error, fuzzy
+
+CANDIDATES = [
+    ("the slow white rat", "this sentence is diferent"),
+    ("the quick brown fox", "something else"),
+    "different saying with many words",
+    "the fox",
+    ["house", "casa", "Haus"],
+    ""
+]
+
+TARGETS = [
+    "fox",
+    "the",
+    "diferent",
+    "diferent wth wors",
+    "Haus",
+    "hous",
+    "the quick fox"
+]
+
+def test_index_match_all():
+    """Ensure that FuzzyIndex.match_all returns the same results as fuzzy.match_all"""
+
+    index = fuzzy.FuzzyIndex(CANDIDATES)
+    assert len(index) == len(CANDIDATES)
+
+    for target in TARGETS:
+        for threshold in (0, 1, 5, 8):
+            assert index.match_all(target, threshold) == fuzzy.match_all(target, CANDIDATES, threshold)
+
+    results = index.match_all("fox", 1)
+    assert [result.index for result in results] == [1, 3]
+    assert results[0].value == ("the quick brown fox", "something else")
+    assert results[0].inner_index == 0
+    assert results[1].value == "the fox"
+    assert results[1].inner_index is None
+
+def test_index_match_closest():
+    """Ensure that FuzzyIndex.match_closest returns the same results as fuzzy.match_closest"""
+
+    index = fuzzy.FuzzyIndex(CANDIDATES)
+
+    for target in TARGETS:
+        for threshold in (0, 1, 5, 8):
+            assert index.match_closest(target, threshold) == fuzzy.match_closest(target, CANDIDATES, threshold)
+
+    result = index.match_closest("Buch casa")
+    assert result.index == 4
+    assert result.value == ["house", "casa", "Haus"]
+    assert result.inner_index == 1
+
+    result = index.match_closest("xyz qwertz")
+    assert result.score == 0.0
+    assert result.value is None
+
+def test_index_prefilter():
+    """Ensure that the prefilter doesn't change the results"""
+
+    rand = random.Random(42)
+    vocab = ["".join(rand.choice("abcdeäöü") for _ in range(rand.randint(1, 8))) for _ in range(60)]
+    candidates: list[str | tuple[str, ...]] = [" ".join(rand.sample(vocab, rand.randint(1, 4))) for _ in range(300)]
+    for i in range(0, len(candidates), 5):
+        candidates[i] = (str(candidates[i]), " ".join(rand.sample(vocab, 2)))
+    index = fuzzy.FuzzyIndex(candidates)
+
+    for _ in range(15):
+        target = " ".join(rand.sample(vocab, rand.randint(1, 3)))
+        for threshold in (0, 2, 5):
+            expected = []
+            for i, candidate in enumerate(candidates):
+                inner_candidates = [candidate] if isinstance(candidate, str) else candidate
+                scores = [fuzzy.Similarity(target, inner, threshold).calculate() for inner in inner_candidates]
+                if max(scores) > 0.0:
+                    inner_index = None if isinstance(candidate, str) else scores.index(max(scores))
+                    expected.append((i, max(scores), inner_index))
+
+            results = index.match_all(target, threshold)
+            assert [(result.index, result.score, result.inner_index) for result in results] == expected
+
+            # the first candidate with the best score
+            closest = index.match_closest(target, threshold)
+            if len(expected) == 0:
+                assert closest.value is None
+            else:
+                best = max(expected, key=lambda item: item[1])
+                assert (closest.index, closest.score, closest.inner_index) == best
+
+def test_index_match_all_workers():
+    """Ensure that FuzzyIndex.match_all returns the same results if calculated in multiple processes"""
+
+    rand = random.Random(99)
+    vocab = ["".join(rand.choice("abcdef") for _ in range(rand.randint(1, 7))) for _ in range(40)]
+    candidates: list[str | tuple[str, ...]] = [" ".join(rand.sample(vocab, rand.randint(1, 3))) for _ in range(200)]
+    for i in range(0, len(candidates), 3):
+        candidates[i] = (rand.choice(vocab), str(candidates[i]))
+    index = fuzzy.FuzzyIndex(candidates)
+
+    for target in ["abc", "fed cab", vocab[0], "xyz"]:
+        expected = index.match_all(target)
+        assert index.match_all(target, workers=3) == expected
+        assert index.match_all(target, workers=-1) == expected
+        assert fuzzy.match_all(target, candidates, workers=2) == expected
+
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert fuzzy.FuzzyIndex([]).match_all("abc", workers=2) == []
+
+    with pytest.raises(ValueError):
+        index.match_all("abc", workers=0)
+    with pytest.raises(error.WrongTypeError):
+        index.match_all("abc", workers=1.5)
+
+def test_index_match_top_k():
+    """Ensure that FuzzyIndex.match_top_k returns the best results of match_all"""
+
+    rand = random.Random(7)
+    vocab = ["".join(rand.choice("abcdef") for _ in range(rand.randint(1, 7))) for _ in range(40)]
+    candidates: list[str | tuple[str, ...]] = [" ".join(rand.sample(vocab, rand.randint(1, 3))) for _ in range(200)]
+    for i in range(0, len(candidates), 4):
+        candidates[i] = (str(candidates[i]), rand.choice(vocab))
+    index = fuzzy.FuzzyIndex(candidates)
+
+    for _ in range(15):
+        target = " ".join(rand.sample(vocab, rand.randint(1, 2)))
+        all_results = sorted(index.match_all(target), key=lambda result: (-result.score, result.index))
+        for k in (1, 3, 10, 1000):
+            assert index.match_top_k(target, k) == all_results[:k]
+
+    assert not index.match_top_k("abc", 0)
+    with pytest.raises(ValueError):
+        index.match_top_k("abc", -1)
+
+def test_index_match_join():
+    """Ensure that FuzzyIndex.match_join returns the same results as matching each target on its own"""
+
+    index = fuzzy.FuzzyIndex(CANDIDATES)
+    targets = TARGETS + TARGETS[:3] + ["xyz qwertz"]
+
+    for threshold in (0, 1, 5):
+        results = index.match_join(targets, threshold)
+        assert results == [index.match_closest(target, threshold) for target in targets]
+
+        results = index.match_join(targets, threshold, mode="all")
+        assert results == [index.match_all(target, threshold) for target in targets]
+
+    # duplicate targets don't share their MatchResult objects
+    results = index.match_join(["fox", "fox"])
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert index.match_join([]) == []
+    with pytest.raises(ValueError):
+        index.match_join(targets, -1)
+    with pytest.raises(ValueError):
+        index.match_join(targets, mode="best")
+
+def test_index_empty():
+    """Ensure that a FuzzyIndex without candidates works"""
+
+    index = fuzzy.FuzzyIndex([])
+    assert len(index) == 0
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert index.match_all("fox") == []
+    assert index.match_closest("fox").value is None
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert index.match_top_k("fox", 5) == []
+
+def test_index_empty_words():
+    """Ensure that empty strings and empty words from double spaces are scored without warnings"""
+
+    candidates = ["", "a", "x  y", " a", ("", "a  b")]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+
+        index = fuzzy.FuzzyIndex(candidates)
+
+        # pylint: disable-next=use-implicit-booleaness-not-comparison
+        assert index.match_all("") == []
+        assert index.match_closest("").value is None
+
+        results = index.match_all("a  b")
+        assert [(result.index, result.score) for result in results] == [(1, 0.33), (2, 0.5), (3, 0.33), (4, 1.0)]
+        assert results[3].inner_index == 1
+        assert index.match_closest("a  b").index == 4
+        assert [result.index for result in index.match_top_k("a  b", 2)] == [4, 2]
+
+        results = index.match_all("a ")
+        assert [(result.index, result.score) for result in results] == [(1, 0.5), (2, 0.25), (3, 0.5), (4, 0.5)]
+
+        for target in ("a  b", "x  y", "a "):
+            for result in fuzzy.match_all(target, candidates):
+                assert result.score == fuzzy.similarity(target, result.value[result.inner_index]
+                                                        if result.inner_index is not None else result.value)
+
+def test_index_threshold():
+    """Ensure that FuzzyIndex rejects a negative threshold"""
+
+    index = fuzzy.FuzzyIndex(CANDIDATES)
+
+    with pytest.raises(ValueError):
+        index.match_all("fox", -1)
+    with pytest.raises(ValueError):
+        index.match_closest("fox", -1)
+
+def test_index_normalizer():
+    """Ensure that a FuzzyIndex normalizes candidates and targets, but returns the original candidates"""
+
+    candidates = ["Café au Lait", ("Crème Brûlée", "CREME-BRULEE"), "The Dog!"]
+    index = fuzzy.FuzzyIndex(candidates, normalizer=fuzzy.Normalizer())
+
+    assert index.match_closest("cafe au lait") == fuzzy.MatchResult(1.0, "Café au Lait", 0, None)
+    assert index.match_closest("the DOG") == fuzzy.MatchResult(1.0, "The Dog!", 2, None)
+    assert index.match_all("creme brulee") == [fuzzy.MatchResult(1.0, candidates[1], 1, 0)]
+    assert index.match_top_k("Cafe au lait!", 1) == [fuzzy.MatchResult(1.0, "Café au Lait", 0, None)]
+    assert index.match_join(["the dog", "The Dog."]) == [fuzzy.MatchResult(1.0, "The Dog!", 2, None)] * 2
+
+    # without a normalizer, the candidates are compared as they are
+    assert fuzzy.FuzzyIndex(candidates).match_closest("the dog").score < 1.0
+
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.FuzzyIndex(candidates, normalizer=str.lower)
+
+def test_index_add_remove_update():
+    """Ensure that a modified FuzzyIndex returns the same results as a newly built one"""
+
+    index = fuzzy.FuzzyIndex(["the fox", "house"])
+
+    assert index.add("the quick brown fox") == 2
+    assert index.add(("casa", "Haus")) == 3
+    assert len(index) == 4
+    assert index.match_closest("Haus") == fuzzy.MatchResult(1.0, ("casa", "Haus"), 3, 1)
+
+    index.remove(0)
+    assert len(index) == 3
+    assert [result.index for result in index.match_all("the fox")] == [2]
+
+    index.update(1, "mouse")
+    assert index.match_closest("mouse") == fuzzy.MatchResult(1.0, "mouse", 1, None)
+    assert index.match_all("house")[0] == fuzzy.MatchResult(0.8, "mouse", 1, None)
+
+    # removed candidates can't be removed or updated again
+    with pytest.raises(error.KeyNotFoundError):
+        index.remove(0)
+    with pytest.raises(error.KeyNotFoundError):
+        index.update(0, "fox")
+    with pytest.raises(error.KeyNotFoundError):
+        index.remove(4)
+    with pytest.raises(error.WrongTypeError):
+        index.remove("1")
+
+def test_index_modify_random():
+    """Ensure that many random modifications keep the index consistent"""
+
+    rand = random.Random(7)
+    vocab = ["".join(rand.choice("abcdeäöü") for _ in range(rand.randint(1, 8))) for _ in range(40)]
+
+    def random_candidate() -> str | tuple[str, ...]:
+        if rand.random() < 0.2:
+            return (" ".join(rand.sample(vocab, 2)), rand.choice(vocab))
+        return " ".join(rand.sample(vocab, rand.randint(1, 4)))
+
+    candidates: list[str | tuple[str, ...] | None] = [random_candidate() for _ in range(50)]
+    index = fuzzy.FuzzyIndex(candidates)
+
+    for _ in range(200):
+        alive = [i for i, candidate in enumerate(candidates) if candidate is not None]
+        action = rand.random()
+        if action < 0.4:
+            candidate = random_candidate()
+            assert index.add(candidate) == len(candidates)
+            candidates.append(candidate)
+        elif action < 0.7:
+            i = rand.choice(alive)
+            index.remove(i)
+            candidates[i] = None
+        else:
+            i = rand.choice(alive)
+            candidates[i] = random_candidate()
+            index.update(i, candidates[i])
+
+    alive = [i for i, candidate in enumerate(candidates) if candidate is not None]
+    assert len(index) == len(alive)
+    reference = fuzzy.FuzzyIndex([candidates[i] for i in alive])
+
+    for _ in range(20):
+        target = " ".join(rand.sample(vocab, rand.randint(1, 3)))
+        expected = [fuzzy.MatchResult(result.score, result.value, alive[result.index], result.inner_index)
+                    for result in reference.match_all(target)]
+        assert index.match_all(target) == expected
+        assert index.match_top_k(target, 3) == [fuzzy.MatchResult(result.score,
+                                                                   result.value,
+                                                                   alive[result.index],
+                                                                   result.inner_index)
+                                                for result in reference.match_top_k(target, 3)]
+
+def test_index_compaction():
+    """Ensure that the entries of removed and updated candidates don't accumulate"""
+
+    rand = random.Random(3)
+    words = ["quick", "brown", "fox", "lazy", "dog", "jumps", "over", "the"]
+    candidates = [" ".join(rand.sample(words, 3)) for _ in range(10)]
+    index = fuzzy.FuzzyIndex(candidates)
+
+    for _ in range(500):
+        i = rand.randrange(len(candidates))
+        candidates[i] = " ".join(rand.sample(words, 3))
+        index.update(i, candidates[i])
+        # the dead entries never outnumber the other entries
+        # pylint: disable-next=protected-access
+        assert len(index._entry_texts) <= 2 * len(candidates)
+
+    for target in ["quick fox", "lazy dog", "the brown"]:
+        assert index.match_all(target) == fuzzy.FuzzyIndex(candidates).match_all(target)
+
+    index.save("index.bin")
+    loaded = fuzzy.FuzzyIndex.load("index.bin")
+    for i in range(1, 10):
+        loaded.remove(i)
+    # pylint: disable-next=protected-access
+    assert len(loaded._entry_texts) <= 2
+    assert loaded.match_all(candidates[0]) == [fuzzy.MatchResult(1.0, candidates[0], 0, None)]
+    assert loaded.add("lazy fox") == 10
+    assert loaded.match_closest("lazy fox") == fuzzy.MatchResult(1.0, "lazy fox", 10, None)
+    with pytest.raises(error.KeyNotFoundError):
+        loaded.update(5, "fox")
+
+    del loaded
+    os.remove("index.bin")
+
+def test_index_save_load():
+    """Ensure that a saved and loaded FuzzyIndex returns the same results"""
+
+    index = fuzzy.FuzzyIndex(CANDIDATES, normalizer=fuzzy.Normalizer())
+    index.add("the brown dog")
+    index.update(3, "a fox")
+    index.remove(5)
+    index.save("index.bin")
+
+    for mmap in (True, False):
+        loaded = fuzzy.FuzzyIndex.load("index.bin", mmap=mmap)
+        assert len(loaded) == len(index)
+        for target in TARGETS:
+            assert loaded.match_all(target) == [
+                # list candidates are loaded as tuples
+                fuzzy.MatchResult(result.score,
+                                  tuple(result.value) if isinstance(result.value, list) else result.value,
+                                  result.index,
+                                  result.inner_index)
+                for result in index.match_all(target)
+            ]
+            assert loaded.match_closest(target).score == index.match_closest(target).score
+
+        # the loaded index can still be modified, without changing the file
+        assert loaded.add("Brown Fox!") == 7
+        loaded.remove(0)
+        loaded.update(1, "quick")
+        assert loaded.match_closest("brown fox") == fuzzy.MatchResult(1.0, "Brown Fox!", 7, None)
+        assert loaded.match_closest("quick").index == 1
+
+        # a modified loaded index can be saved again
+        loaded.save("index2.bin")
+        reloaded = fuzzy.FuzzyIndex.load("index2.bin", mmap=mmap)
+        for target in TARGETS + ["brown fox", "quick"]:
+            assert reloaded.match_all(target) == loaded.match_all(target)
+        del reloaded
+        os.remove("index2.bin")
+
+    empty = fuzzy.FuzzyIndex([])
+    empty.save("index.bin")
+    assert len(fuzzy.FuzzyIndex.load("index.bin")) == 0
+
+    with open("index.bin", "wb") as f:
+        f.write(b"not an index")
+    with pytest.raises(ValueError):
+        fuzzy.FuzzyIndex.load("index.bin")
+
+    os.remove("index.bin")
+
+def test_index_kernel():
+    """Ensure that a FuzzyIndex with a kernel returns the same results as Similarity"""
+
+    kernel = fuzzy.DamerauKernel()
+    index = fuzzy.FuzzyIndex(CANDIDATES, kernel=kernel)
+
+    for target in TARGETS + ["teh quick fox", "huose"]:
+        expected = []
+        for i, candidate in enumerate(CANDIDATES):
+            inner_candidates = [candidate] if isinstance(candidate, str) else candidate
+            scores = [fuzzy.Similarity(target, inner, kernel=kernel).calculate() for inner in inner_candidates]
+            if max(scores) > 0.0:
+                inner_index = None if isinstance(candidate, str) else scores.index(max(scores))
+                expected.append((i, max(scores), inner_index))
+
+        results = index.match_all(target)
+        assert [(result.index, result.score, result.inner_index) for result in results] == expected
+
+    assert index.match_closest("teh quick fox").index == 1
+    assert fuzzy.FuzzyIndex(["AB12Y", "XY12Z"], kernel=fuzzy.JaroWinklerKernel()).match_closest("AB12X").index == 0
+
+    index.save("index.bin")
+    loaded = fuzzy.FuzzyIndex.load("index.bin")
+    assert [result.score for result in loaded.match_all("huose")] == \
+           [result.score for result in index.match_all("huose")]
+    os.remove("index.bin")
@@ -1,6 +1,14 @@
 """Module containing tests for the abllib.fuzzy module"""
 
-from abllib import fuzzy
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from abllib import error, fuzzy
+from abllib.fuzzy import _similarity
 
 # pylint: disable=protected-access, unidiomatic-typecheck
 
@@ -74,6 +82,21 @@ def test_all_matchresult():
     assert m[0].value == ("the slow white rat", "this sentence is diferent")
     assert m[0].inner_index == 1
 
+def test_matchresult_slots():
+    """Ensure that MatchResult and Similarity don't have a __dict__"""
+
+    result = fuzzy.MatchResult(0.5, "fox", 1)
+    assert not hasattr(result, "__dict__")
+    assert result == fuzzy.MatchResult(0.5, "fox", 1, None)
+    result.score = 0.75
+    assert result.score == 0.75
+
+    with pytest.raises(AttributeError):
+        # pylint: disable-next=assigning-non-slot
+        result.other = 1
+
+    assert not hasattr(fuzzy.Similarity("the fox", "a fox"), "__dict__")
+
 def test_closest():
     """Ensure that fuzzy.match_closest works at all"""
 
@@ -142,6 +165,113 @@ def test_closest_matchresult():
     assert m.value == ("the slow white rat", "this sentence is diferent")
     assert m.inner_index == 1
 
+def test_iter_matches():
+    """Ensure that fuzzy.iter_matches yields the same results as fuzzy.match_all"""
+
+    inputs = [
+        ("the slow white rat", "this sentence is diferent"),
+        ("the quick brown fox", "something else"),
+        "different saying with many words",
+        "the fox"
+    ] * 30
+
+    for target in ["fox", "the", "diferent", "diferent wth wors"]:
+        for threshold in (0, 1, 5):
+            expected = fuzzy.match_all(target, inputs, threshold)
+            assert list(fuzzy.iter_matches(target, inputs, threshold)) == expected
+            assert list(fuzzy.iter_matches(target, iter(inputs), threshold)) == expected
+
+def test_iter_matches_lazy():
+    """Ensure that fuzzy.iter_matches doesn't read all candidates at once"""
+
+    read = []
+
+    def candidates():
+        for i in range(100_000):
+            read.append(i)
+            yield "the fox" if i == 3 else "something else"
+
+    results = fuzzy.iter_matches("fox", candidates())
+    # nothing is read before the first result is requested
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert read == []
+
+    result = next(results)
+    assert result.value == "the fox"
+    assert result.index == 3
+    assert len(read) < 100
+
+    with pytest.raises(ValueError):
+        fuzzy.iter_matches("fox", [], -1)
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.iter_matches(None, [])
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.iter_matches("fox", "the fox")
+    with pytest.raises(error.WrongTypeError):
+        list(fuzzy.iter_matches("fox", ["the fox", 42]))
+
+def test_join():
+    """Ensure that fuzzy.match_join matches each target"""
+
+    targets = ["cat", "hors", "xyz", "cat"]
+    inputs = ["dog", "car", "card", "horse", "mouse", "cat"]
+
+    results = fuzzy.match_join(targets, inputs)
+    assert [result.value for result in results] == ["cat", "horse", None, "cat"]
+    assert results[1].index == 3
+    assert results[1].score == 0.8
+
+    results = fuzzy.match_join(targets, inputs, mode="all")
+    assert len(results) == 4
+    assert [result.value for result in results[0]] == ["car", "card", "cat"]
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert results[2] == []
+
+    with pytest.raises(ValueError):
+        fuzzy.match_join(targets, inputs, mode="best")
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.match_join("cat", inputs)
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.match_join(targets, "cat")
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.match_join([None], inputs)
+
+def test_top_k():
+    """Ensure that fuzzy.match_top_k returns the best candidates in order"""
+
+    target = "cat"
+    inputs = ["dog", "car", "card", "horse", "cat", ("cart", "mouse")]
+
+    results = fuzzy.match_top_k(target, inputs, 2)
+    assert len(results) == 2
+    assert results[0].value == "cat"
+    assert results[0].score == 1.0
+    assert results[0].index == 4
+    assert results[1].value == ("cart", "mouse")
+    assert results[1].score == 0.75
+    assert results[1].index == 5
+    assert results[1].inner_index == 0
+
+    results = fuzzy.match_top_k(target, inputs, 10)
+    assert [result.index for result in results] == [4, 5, 1, 2]
+
+    # candidates with the same score are sorted by index
+    results = fuzzy.match_top_k("ab", ["xy", "ac", "bb", "abc"], 2)
+    assert [result.index for result in results] == [3, 1]
+
+    # pylint: disable-next=use-implicit-booleaness-not-comparison
+    assert fuzzy.match_top_k(target, inputs, 0) == []
+    with pytest.raises(ValueError):
+        fuzzy.match_top_k(target, inputs, -1)
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.match_top_k(target, inputs, 1.5)
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.match_top_k(target, "cat", 2)
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.match_top_k(target, ["cat", ("dog", None)], 2)
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.match_top_k(None, inputs, 2)
+
 def test_similarity():
     """Ensure that the similarity calculation works as expected"""
 
@@ -174,8 +304,9 @@ def test_similarity():
                      "a long pretty sentence is given as a candidate candidate") == 0.5
     assert similarity("first first second",
                       "first secon") == 0.61
+    # sentene -> sentence (0.88), sentnc -> sent (0.67)
     assert similarity("sentene word sentnc",
-                      "se sen sent sente sentence") == 0.18
+                      "se sen sent sente sentence") == 0.31
 
 def test_similarity_same_words():
     """Ensure that passing many identical words return the correct score"""
@@ -196,6 +327,20 @@ def test_similarity_same_words():
     assert similarity("word word word word word word wor",
                       "word word word word word word word") == 0.97
 
+def test_similarity_optimal_assignment():
+    """Ensure that the word assignment maximizes the total score, even if many words compete for the same word"""
+
+    similarity = fuzzy.similarity
+    # words -> words, cord -> cord, world -> word, wor -> words
+    assert similarity("words cord world wor",
+                      "words word sentence words cord") == 0.68
+    assert similarity("word word word word word word word word word word word word",
+                      "wor wor wor wor wor wor wor wor wor wor wor word") == 0.77
+
+    # this would need 30! combinations if all of them were tried
+    assert similarity(" ".join(["word"] * 30),
+                      " ".join(["wor"] + ["word"] * 29)) == 0.99
+
 def test_similarity_swappable():
     """Ensure that swapping the arguments for similarity calculation returns the same score"""
 
@@ -203,3 +348,259 @@ def test_similarity_swappable():
     assert similarity("hoy", "the quick fox") == similarity("the quick fox", "hoy")
     assert similarity("sentence sen ntence", "sentence sentence candidate") \
            == similarity("sentence sentence candidate", "sentence sen ntence")
+
+def test_similarity_scores_array(monkeypatch):
+    """Ensure that the vectorized scores_array is the same as the one constructed cell by cell"""
+
+    rand = random.Random(555)
+    words = ["".join(rand.choice("abcd") for _ in range(rand.randint(0, 9))) for _ in range(50)]
+
+    for _ in range(100):
+        target = " ".join(rand.choices(words, k=rand.randint(1, 8)))
+        candidate = " ".join(rand.choices(words, k=rand.randint(1, 8)))
+        threshold = rand.randint(0, 5)
+
+        monkeypatch.setattr(_similarity, "_MIN_VECTORIZED_CELLS", 0)
+        vectorized = fuzzy.Similarity(target, candidate, threshold)
+        monkeypatch.setattr(_similarity, "_MIN_VECTORIZED_CELLS", 1_000_000)
+        small = fuzzy.Similarity(target, candidate, threshold)
+
+        assert vectorized.scores_array.tolist() == small.scores_array.tolist()
+
+def test_similarity_lazy():
+    """Ensure that fuzzy.Similarity only constructs the scores_array if the complex score could be higher"""
+
+    sim = fuzzy.Similarity("the quick brown fox", "the quick brown fox")
+    assert sim.calculate() == 1.0
+    assert sim._scores_array is None
+
+    sim = fuzzy.Similarity("house", "mouse")
+    assert sim.calculate() == 0.8
+    assert sim._scores_array is None
+
+    # the complex score can be at most 2 / 4, which is below the simple score of 5 / 9
+    sim = fuzzy.Similarity("ab cd", "ab cd e f")
+    assert sim.calculate() == 0.56
+    assert sim._scores_array is None
+
+    sim = fuzzy.Similarity("fox quick", "the quick fox")
+    assert sim.calculate() == 0.67
+    assert sim._scores_array is not None
+
+    rand = random.Random(31)
+    words = ["".join(rand.choice("abc") for _ in range(rand.randint(1, 6))) for _ in range(30)]
+    for _ in range(200):
+        target = " ".join(rand.choices(words, k=rand.randint(1, 4)))
+        candidate = " ".join(rand.choices(words, k=rand.randint(1, 4)))
+
+        sim = fuzzy.Similarity(target, candidate)
+        expected = round(max(sim._calculate_simple(), sim._calculate_complex()), 2)
+        assert fuzzy.Similarity(target, candidate).calculate() == expected
+
+def test_distance_cache():
+    """Ensure that the word distances are cached across all matching functions"""
+
+    cache = fuzzy.DistanceCache
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+    assert fuzzy.similarity("the quick fox", "the slow fox") == 0.67
+    assert cache.misses > 0
+    misses = cache.misses
+    hits = cache.hits
+
+    # all 3 * 3 word pairs are served from the cache
+    assert fuzzy.similarity("the quick fox", "the slow fox") == 0.67
+    assert cache.misses == misses
+    assert cache.hits == hits + 9
+
+    # the order of the words doesn't matter
+    assert fuzzy.similarity("the slow fox", "the quick fox") == 0.67
+    assert cache.misses == misses
+
+    hits = cache.hits
+    fuzzy.match_all("the quick fox", ["the slow fox"])
+    assert cache.misses == misses
+    assert cache.hits > hits
+
+    hits = cache.hits
+    fuzzy.match_closest("the quick fox", ["the slow fox"])
+    assert cache.misses == misses
+    assert cache.hits > hits
+
+    # the distances calculated by an index are shared as well
+    cache.clear()
+    index = fuzzy.FuzzyIndex(["the slow fox", "a quick dog"])
+    assert index.match_closest("the quick fox").value == "the slow fox"
+    assert cache.misses > 0
+    assert cache.hits == 0
+    assert fuzzy.similarity("the quick fox", "the slow fox") == 0.67
+    assert cache.hits > 0
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+def test_distance_cache_get_many():
+    """Ensure that the word distance cache calculates many distances at once"""
+
+    cache = fuzzy.DistanceCache
+    cache.clear()
+
+    words1 = ["fox", "fox", "fox", "the", "fox"]
+    words2 = ["fog", "dog", "the", "fox", "fog"]
+    dists = cache.get_many(words1, words2, np.array([2, 2, 2, 2, 0]))
+    assert dists.tolist() == [1, 2, 3, 3, 1]
+    assert cache.misses == 5
+
+    # ("fox", "the") and ("the", "fox") are the same pair
+    dists = cache.get_many(["fog", "the"], ["fox", "fox"], np.array([2, 2]))
+    assert dists.tolist() == [1, 3]
+    assert cache.hits == 2
+    assert cache.get("fox", "dog", 2) == 2
+    assert cache.hits == 3
+
+    cache.clear()
+
+def test_distance_cache_resize():
+    """Ensure that the word distance cache evicts the least recently used distances"""
+
+    cache = fuzzy.DistanceCache
+    cache.clear()
+    default_size = cache.maxsize
+
+    try:
+        cache.resize(2)
+        assert cache.get("fox", "fog", 2) == 1
+        assert cache.get("fox", "dog", 2) == 2
+        assert cache.get("fox", "fog", 2) == 1
+        assert cache.get("fox", "the", 2) == 3
+        assert len(cache) == 2
+        assert cache.hits == 1
+
+        # ("fox", "dog") was the least recently used pair
+        assert cache.get("fox", "fog", 2) == 1
+        assert cache.get("fox", "dog", 2) == 2
+        assert cache.hits == 2
+        assert cache.misses == 4
+
+        cache.resize(0)
+        assert len(cache) == 0
+        assert cache.get("fox", "fog", 2) == 1
+        assert len(cache) == 0
+
+        with pytest.raises(ValueError):
+            cache.resize(-1)
+        with pytest.raises(error.WrongTypeError):
+            cache.resize("10")
+    finally:
+        cache.resize(default_size)
+        cache.clear()
+
+def test_normalizer():
+    """Ensure that the Normalizer normalizes strings as expected"""
+
+    normalizer = fuzzy.Normalizer()
+    assert normalizer("Café") == "cafe"
+    assert normalizer("Straße") == "strasse"
+    assert normalizer("ﬁne") == "fine"
+    assert normalizer("Hello,  World!") == "hello world"
+    assert normalizer("  the\tquick...fox\n") == "the quick fox"
+    assert normalizer("!?") == ""
+    assert normalizer("") == ""
+
+    assert fuzzy.Normalizer(casefold=False)("Café") == "Cafe"
+    assert fuzzy.Normalizer(strip_accents=False)("Café") == "café"
+    assert fuzzy.Normalizer(collapse_punctuation=False)("Hello,  World!") == "hello,  world!"
+    assert fuzzy.Normalizer(transliterate=True)("Größe") == "grosse"
+
+    with pytest.raises(error.WrongTypeError):
+        normalizer(None)
+
+def test_similarity_kernels():
+    """Ensure that Similarity uses the given kernel"""
+
+    assert fuzzy.similarity("the quick fox", "teh quick fox") == 0.85
+    assert fuzzy.similarity("the quick fox", "teh quick fox", fuzzy.DamerauKernel()) == 0.92
+    assert fuzzy.similarity("cat", "car", fuzzy.LevenshteinKernel()) == fuzzy.similarity("cat", "car")
+
+    jaro_winkler = fuzzy.JaroWinklerKernel()
+    assert fuzzy.similarity("AB12X", "AB12Y", jaro_winkler) == 0.92
+    assert fuzzy.similarity("AB12X", "ZZ99Q", jaro_winkler) == 0.0
+    # rejected by the length bound
+    assert fuzzy.similarity("A", "AB12XYZ", jaro_winkler) == 0.0
+    assert fuzzy.similarity("A", "AB12XYZ", fuzzy.JaroWinklerKernel(min_score=0.5)) == 0.74
+
+    token_set = fuzzy.TokenSetKernel()
+    assert fuzzy.similarity("quick fox", "the quick brown fox", token_set) == 1.0
+    assert fuzzy.similarity("fox fox quick", "quick fox", token_set) == 1.0
+    assert fuzzy.similarity("dog", "cat", token_set) == 0.0
+
+    # the kernels are symmetric
+    for kernel in (fuzzy.DamerauKernel(), jaro_winkler, token_set):
+        assert fuzzy.similarity("the fox", "a quick fox", kernel) == fuzzy.similarity("a quick fox", "the fox", kernel)
+
+    with pytest.raises(error.WrongTypeError):
+        fuzzy.similarity("cat", "car", "levenshtein")
+    with pytest.raises(ValueError):
+        fuzzy.JaroWinklerKernel(min_score=2.0)
+    with pytest.raises(TypeError):
+        # pylint: disable-next=abstract-class-instantiated
+        fuzzy.Kernel()
+
+def test_amatch():
+    """Ensure that amatch_all and amatch_closest return the same results as match_all and match_closest"""
+
+    rand = random.Random(5)
+    vocab = ["".join(rand.choice("abcde") for _ in range(rand.randint(1, 6))) for _ in range(50)]
+    candidates: list[str | tuple[str, ...]] = [" ".join(rand.sample(vocab, rand.randint(1, 3))) for _ in range(200)]
+    candidates[7] = ("the quick fox", "the slow fox")
+    targets = ["the quick fox", vocab[0], f"{vocab[1]} {vocab[2]}"]
+
+    async def run_all() -> None:
+        with ThreadPoolExecutor(1) as executor:
+            for target in targets:
+                expected_all = fuzzy.match_all(target, candidates)
+                expected_closest = fuzzy.match_closest(target, candidates)
+                for chunk_size in (1, 16, 1024):
+                    assert await fuzzy.amatch_all(target, candidates, chunk_size=chunk_size) == expected_all
+                    assert await fuzzy.amatch_closest(target, candidates, chunk_size=chunk_size) == expected_closest
+                assert await fuzzy.amatch_all(target, candidates, executor=executor) == expected_all
+                assert await fuzzy.amatch_closest(target, candidates, executor=executor) == expected_closest
+
+        # pylint: disable-next=use-implicit-booleaness-not-comparison
+        assert await fuzzy.amatch_all("fox", []) == []
+        assert (await fuzzy.amatch_closest("fox", [])).value is None
+
+    asyncio.run(run_all())
+
+    with pytest.raises(ValueError):
+        asyncio.run(fuzzy.amatch_all("fox", candidates, chunk_size=0))
+    with pytest.raises(ValueError):
+        asyncio.run(fuzzy.amatch_closest("fox", candidates, -1))
+    with pytest.raises(error.WrongTypeError):
+        asyncio.run(fuzzy.amatch_all("fox", candidates, executor="executor"))
+
+def test_amatch_yields():
+    """Ensure that amatch_all lets other tasks run between chunks"""
+
+    candidates = [f"candidate {i}" for i in range(50)]
+
+    async def run_concurrently() -> int:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await fuzzy.amatch_all("candidate", candidates, chunk_size=5)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run_concurrently()) >= 5
@@ -637,6 +637,33 @@ def test_basestorage_non_ascii():
     BaseStorage["testkey2"] = "ハウルの動く城"
     assert BaseStorage["testkey2"] == "ハウルの動く城"
 
+def test_basestorage_cached_keys():
+    """Ensure that repeatedly used keys behave the same as new ones"""
+
+    BaseStorage = _BaseStorage.__new__(_BaseStorage)
+    BaseStorage._store = {}
+
+    for _ in range(3):
+        BaseStorage["key1.key2.key3"] = "value"
+        assert "key1.key2.key3" in BaseStorage
+        assert BaseStorage["key1.key2.key3"] == "value"
+        del BaseStorage["key1.key2.key3"]
+        assert "key1.key2.key3" not in BaseStorage
+        assert "key1" not in BaseStorage
+
+        with pytest.raises(InvalidKeyError):
+            BaseStorage["key1..key2"]
+        with pytest.raises(WrongTypeError):
+            BaseStorage[list(("key1",))]
+
+    BaseStorage["key1.key2"] = "value"
+    with pytest.raises(KeyNotFoundError, match="'key1.key2.key3'"):
+        BaseStorage["key1.key2.key3.key4"]
+    with pytest.raises(KeyNotFoundError, match="'key1.other'"):
+        del BaseStorage["key1.other.key3"]
+    with pytest.raises(KeyNotFoundError, match="'key1.key3'"):
+        BaseStorage["key1.key3"]
+
 def test_internalstorage_inheritance():
     """Ensure the InternalStorage inherits from _BaseStorage"""
 
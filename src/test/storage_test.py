@@ -2,11 +2,13 @@
 
 import json
 import os
+from time import sleep
 
 import pytest
 
 from abllib import _storage, error
 from abllib._storage._base_storage import _BaseStorage
+from abllib.pproc import WorkerThread
 from abllib.storage import (_CacheStorage, _PersistentStorage, _StorageView,
                             _ThreadsafeStorage, _VolatileStorage)
 
@@ -118,6 +120,30 @@ def test_volatilestorage_del_autoremovedict():
     assert "key1.key2" not in VolatileStorage
     assert "key1" not in VolatileStorage
 
+def test_volatilestorage_locking():
+    """Ensure that writes wait for running reads, and that each storage has its own lock"""
+
+    VolatileStorage = _VolatileStorage.__new__(_VolatileStorage)
+    VolatileStorage._store = {}
+    VolatileStorage["key1"] = "value"
+
+    assert VolatileStorage._lock is not _PersistentStorage._lock
+    assert VolatileStorage._lock is not _ThreadsafeStorage._lock
+
+    def write():
+        VolatileStorage["key1"] = "value2"
+
+    VolatileStorage._lock.acquire_read()
+    thread = WorkerThread(target=write)
+    thread.start()
+    sleep(0.1)
+    assert VolatileStorage["key1"] == "value"
+
+    VolatileStorage._lock.release_read()
+    thread.join(reraise=True)
+    assert VolatileStorage["key1"] == "value2"
+    assert not VolatileStorage._lock.locked()
+
 def test_persistentstorage_inheritance():
     """Ensure the PersistentStorage inherits from _BaseStorage"""
 
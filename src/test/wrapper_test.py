@@ -145,6 +145,113 @@ def test_semaphore_nested():
     sem1.release()
     sem2.release()
 
+def test_readwritelock():
+    """Ensure that ReadWriteLock works as expected"""
+
+    assert hasattr(wrapper, "ReadWriteLock")
+    assert callable(wrapper.ReadWriteLock)
+
+    lock = wrapper.ReadWriteLock()
+    assert not lock.locked()
+
+    # multiple readers, and nested reads
+    assert lock.acquire_read()
+    assert lock.acquire_read()
+    assert lock.locked()
+    assert not lock.write_locked()
+    assert _try_in_thread(lock.acquire_read, lock.release_read, False)
+    assert not _try_in_thread(lock.acquire_write, lock.release_write, True, 0.1)
+    with pytest.raises(error.LockAcquisitionTimeoutError):
+        lock.acquire_write()
+    lock.release_read()
+    assert lock.locked()
+    lock.release_read()
+    assert not lock.locked()
+
+    # nested writes, and reads within a write
+    assert lock.acquire_write()
+    assert lock.acquire_write()
+    assert lock.acquire_read()
+    assert lock.write_locked()
+    assert not _try_in_thread(lock.acquire_read, lock.release_read, True, 0.1)
+    assert not _try_in_thread(lock.acquire_write, lock.release_write, False)
+    lock.release_read()
+    lock.release_write()
+    assert lock.write_locked()
+    lock.release_write()
+    assert not lock.locked()
+
+    # releasing an unlocked lock should do nothing
+    lock.release_read()
+    lock.release_write()
+
+    assert _try_in_thread(lock.acquire_write, lock.release_write, False)
+
+def test_readwritelock_writer_preference():
+    """Ensure that waiting writers are preferred over new readers"""
+
+    lock = wrapper.ReadWriteLock()
+    events = []
+
+    def write():
+        lock.acquire_write()
+        events.append("write")
+        lock.release_write()
+
+    def read():
+        lock.acquire_read()
+        events.append("read")
+        lock.release_read()
+
+    lock.acquire_read()
+    writer = WorkerThread(target=write)
+    writer.start()
+    # pylint: disable-next=protected-access
+    while lock._waiting_writers == 0:
+        sleep(0.001)
+
+    # the writer waits for the read lock, so new readers wait for the writer
+    reader = WorkerThread(target=read)
+    reader.start()
+    sleep(0.1)
+    assert not events
+
+    lock.release_read()
+    writer.join(reraise=True)
+    reader.join(reraise=True)
+
+    assert events == ["write", "read"]
+
+def test_readwritelock_timeout():
+    """Ensure that ReadWriteLock timeouts are within expected boundaries"""
+
+    lock = wrapper.ReadWriteLock()
+    lock.acquire_read()
+
+    start_time = monotonic()
+    assert not _try_in_thread(lock.acquire_write, lock.release_write, True, 0.2)
+
+    duration = monotonic() - start_time
+    assert duration > 0.15
+    # generous, so that it doesn't fail on busy machines
+    assert duration < 2
+
+    # the timed out writer doesn't block new readers
+    assert _try_in_thread(lock.acquire_read, lock.release_read, True, 0.1)
+
+def _try_in_thread(acquire, release, *args):
+    """Try to acquire a lock in another thread, and release it again if it was acquired"""
+
+    def func():
+        acquired = acquire(*args)
+        if acquired:
+            release()
+        return acquired
+
+    thread = WorkerThread(target=func)
+    thread.start()
+    return thread.join(reraise=True)
+
 def test_namedlock():
     """Ensure that NamedLock works as expected"""
 